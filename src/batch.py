@@ -0,0 +1,200 @@
+from PIL import Image
+
+import concurrent.futures
+import glob
+import os
+
+from operations import ImageDocument, Resize, rotation
+from outofcore import load, openImage
+from transforms import encodableImage
+
+
+class BatchResult:
+    def __init__(
+        self, source: str, target: str = None, bytesRead: int = 0,
+        bytesWritten: int = 0, error: str = None
+    ) -> None:
+        self.source = source
+        self.target = target
+        self.bytesRead = bytesRead
+        self.bytesWritten = bytesWritten
+        self.error = error
+
+
+def parseSize(value: str) -> tuple:
+    try:
+        if value.endswith("%"):
+            percentage = float(value[:-1])
+            if percentage <= 0:
+                raise ValueError()
+            return (percentage,)
+
+        width, _, height = value.lower().partition("x")
+        size = (
+            int(width) if width else None,
+            int(height) if height else None,
+        )
+    except ValueError:
+        raise ValueError(f"Invalid Size: \"{value}\"")
+
+    if size == (None, None) or any(
+        side is not None and side <= 0 for side in size
+    ):
+        raise ValueError(f"Invalid Size: \"{value}\"")
+    return size
+
+
+def targetSize(size: tuple, requested: tuple) -> tuple:
+    # A requested size is (percentage,) or (width, height,) where one of
+    # the two sides may be None to keep the aspect ratio.
+    if len(requested) == 1:
+        return (
+            max(1, round(size[0] * requested[0] / 100)),
+            max(1, round(size[1] * requested[0] / 100)),
+        )
+
+    width, height = requested
+    if width is None:
+        width = max(1, round(size[0] * height / size[1]))
+    elif height is None:
+        height = max(1, round(size[1] * width / size[0]))
+    return (width, height,)
+
+
+def pipelineDocument(
+    image: Image.Image, pipeline: list, fillcolor=None
+) -> ImageDocument:
+    # A pipeline is a list of ("--resize", size) and ("--rotate", angle)
+    # steps, the same shape the command line collects its options in.
+    document = ImageDocument(image)
+    for step, value in pipeline:
+        if step == "--resize":
+            operation = Resize(targetSize(document.size, value))
+        else:
+            operation = rotation(value, fillcolor)
+        document = document.withOperation(operation)
+    return document
+
+
+def expandSources(source: str) -> list:
+    if os.path.isdir(source):
+        extensions = Image.registered_extensions()
+        return sorted(
+            os.path.join(source, name) for name in os.listdir(source)
+            if os.path.splitext(name)[1].lower() in extensions
+            and os.path.isfile(os.path.join(source, name))
+        )
+    return sorted(
+        path for path in glob.glob(source, recursive=True)
+        if os.path.isfile(path)
+    )
+
+
+def extensionFor(imageFormat: str) -> str:
+    extensions = Image.registered_extensions()
+    extension = f".{imageFormat.lower()}"
+    if extensions.get(extension) == imageFormat:
+        return extension
+    return next(
+        (
+            extension for extension, extensionFormat in extensions.items()
+            if extensionFormat == imageFormat
+        ),
+        extension
+    )
+
+
+def targetPath(
+    source: str, outputDir: str, extension: str, taken: set = None
+) -> str:
+    # Sources with the same name (a.png and a.jpg, or two globbed folders)
+    # would be written to the same file by two workers at once, so later
+    # ones are numbered like the Export dialog does.
+    name = os.path.splitext(os.path.basename(source))[0]
+    path, number = os.path.join(outputDir, name + extension), 2
+    if taken is None:
+        return path
+    while os.path.normcase(path) in taken:
+        path = os.path.join(outputDir, f"{name}-{number}{extension}")
+        number += 1
+    taken.add(os.path.normcase(path))
+    return path
+
+
+def saveImage(image: Image.Image, path: str, imageFormat: str) -> None:
+    # Written next to the target and moved over it once complete, so a
+    # failed or interrupted save never leaves a truncated file behind.
+    partPath = f"{path}.part"
+    try:
+        image.save(partPath, imageFormat)
+        os.replace(partPath, path)
+    except BaseException:
+        try:
+            os.remove(partPath)
+        except OSError:
+            pass
+        raise
+
+
+def convertFile(
+    source: str, target: str, imageFormat: str, pipeline: list,
+    fillcolor=None
+) -> BatchResult:
+    # Runs in a worker process, so every failure is reported as part of the
+    # result instead of tearing down the whole batch.
+    try:
+        with openImage(source) as image:
+            document = pipelineDocument(load(image), pipeline, fillcolor)
+            result = document.render()
+            saveImage(encodableImage(result, imageFormat), target, imageFormat)
+        return BatchResult(
+            source, target, os.path.getsize(source), os.path.getsize(target)
+        )
+    except Exception as e:
+        return BatchResult(source, error=str(e))
+
+
+def runBatch(
+    sources: list, outputDir: str, imageFormat: str, extension: str,
+    pipeline: list, fillcolor=None, workers: int = None, cancelled=None
+):
+    import multiprocessing
+
+    workers = workers or os.cpu_count() or 1
+    pending = iter(sources)
+    running = set()
+    taken = set()
+
+    os.makedirs(outputDir, exist_ok=True)
+
+    # Only a couple of files per worker are queued at any time and results
+    # are yielded as soon as they complete, so a batch of thousands of
+    # files keeps the same footprint as a batch of ten. Workers are spawned
+    # rather than forked because the GUI runs batches from a Qt thread. The
+    # process pool machinery is only loaded once a batch actually starts.
+    with concurrent.futures.ProcessPoolExecutor(
+        workers, mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        try:
+            while True:
+                while len(running) < workers * 2:
+                    source = next(pending, None)
+                    if source is None:
+                        break
+                    running.add(executor.submit(
+                        convertFile, source,
+                        targetPath(source, outputDir, extension, taken),
+                        imageFormat, pipeline, fillcolor
+                    ))
+
+                if not running or (cancelled is not None and cancelled()):
+                    break
+
+                done, running = concurrent.futures.wait(
+                    running, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done:
+                    yield future.result()
+        finally:
+            for future in running:
+                future.cancel()
@@ -0,0 +1,262 @@
+from PIL import Image, UnidentifiedImageError
+
+import argparse
+import os
+import signal
+import sys
+import time
+
+from batch import (
+    expandSources,
+    extensionFor,
+    parseSize,
+    pipelineDocument,
+    runBatch,
+    saveImage
+)
+from outofcore import load, openImage
+from transforms import encodableImage
+
+
+class OperationAction(argparse.Action):
+    # Edits are kept in command line order, so "--rotate 90 --resize 800x"
+    # and "--resize 800x --rotate 90" give different results.
+    def __call__(self, parser, namespace, values, option_string=None):
+        operations = getattr(namespace, self.dest, None) or []
+        operations.append((option_string, values,))
+        setattr(namespace, self.dest, operations)
+
+
+def sizeArgument(value: str) -> tuple:
+    try:
+        return parseSize(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def pasteImage() -> Image.Image:
+    if sys.platform in ["win32", "darwin"]:
+        from PIL import ImageGrab
+
+        image = ImageGrab.grabclipboard()
+    else:
+        # Only a QGuiApplication is needed to reach the clipboard, which is
+        # far cheaper than the widgets and the stylesheet of the window.
+        from PyQt5.QtGui import QGuiApplication
+
+        from clipboardimage import imageFromMimeData
+
+        app = QGuiApplication.instance() or QGuiApplication(sys.argv[:1])
+        mimeData = app.clipboard().mimeData()
+        image = imageFromMimeData(mimeData) if mimeData is not None else None
+
+    if type(image) is list:
+        image = Image.open(image[0])
+    if not isinstance(image, Image.Image):
+        raise ValueError("Unable To Find An Image In Your Clipboard!")
+    return image
+
+
+def formatFromPath(path: str) -> str:
+    extension = os.path.splitext(path)[1].lower()
+    try:
+        return Image.registered_extensions()[extension]
+    except KeyError:
+        raise ValueError(f"Unknown File Extension: \"{extension}\"")
+
+
+def createParser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="clipboard2image",
+        description="Convert An Image Without Opening The Window."
+    )
+
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument(
+        "--paste", action="store_true",
+        help="read the image from the clipboard"
+    )
+    source.add_argument(
+        "--in", dest="input", metavar="PATH",
+        help="read the image from a file"
+    )
+    source.add_argument(
+        "--batch", metavar="SOURCE",
+        help="convert every image in a directory or matching a glob"
+    )
+    source.add_argument(
+        "--watch", metavar="DIR", nargs="?", const="",
+        help="save every new clipboard image to a rolling directory"
+    )
+
+    parser.add_argument(
+        "--resize", dest="operations", metavar="SIZE", type=sizeArgument,
+        action=OperationAction,
+        help="resize to WIDTHxHEIGHT, WIDTHx, xHEIGHT or PERCENT%%"
+    )
+    parser.add_argument(
+        "--rotate", dest="operations", metavar="DEGREES", type=float,
+        action=OperationAction,
+        help="rotate counter-clockwise by the given angle"
+    )
+    parser.add_argument(
+        "--fill", metavar="COLOR",
+        help="fill color for the corners uncovered by a rotation"
+    )
+
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument(
+        "-o", "--output", metavar="PATH",
+        help="write the image to a file, the format follows the extension"
+    )
+    target.add_argument(
+        "--stdout", action="store_true",
+        help="write the encoded image to standard output"
+    )
+    target.add_argument(
+        "--out-dir", metavar="DIR",
+        help="directory the converted images of a batch are written to"
+    )
+    parser.add_argument(
+        "--format",
+        help="output format, defaults to the extension or the input format"
+    )
+    parser.add_argument(
+        "--workers", type=int, metavar="N",
+        help="number of processes of a batch, defaults to the CPU count"
+    )
+    parser.add_argument(
+        "--keep", type=int, metavar="N", default=500,
+        help="number of captures kept by --watch"
+    )
+
+    return parser
+
+
+def main(argv: list, callpath: str) -> int:
+    parser = createParser()
+    args = parser.parse_args(argv)
+
+    if args.watch is not None:
+        return watchMain(args, callpath)
+    if (args.batch is None) != (args.out_dir is None):
+        parser.error("--batch and --out-dir have to be used together")
+    if args.batch is not None:
+        return batchMain(parser, args, callpath)
+    if args.output is None and not args.stdout:
+        parser.error("one of the arguments -o/--output --stdout is required")
+
+    try:
+        if args.paste:
+            image = pasteImage()
+        else:
+            image = load(openImage(os.path.join(callpath, args.input)))
+
+        document = pipelineDocument(image, args.operations or [], args.fill)
+
+        # All edits are fused first, so the original pixels are resampled
+        # at most once however many options were given.
+        result = document.render()
+
+        if args.stdout:
+            imageFormat = (args.format or document.format or "PNG").upper()
+            encodableImage(result, imageFormat).save(
+                sys.stdout.buffer, imageFormat
+            )
+            sys.stdout.buffer.flush()
+        else:
+            path = os.path.join(callpath, args.output)
+            imageFormat = (args.format or formatFromPath(path)).upper()
+            saveImage(encodableImage(result, imageFormat), path, imageFormat)
+    except (
+        UnidentifiedImageError, Image.DecompressionBombError, OSError,
+        ValueError
+    ) as e:
+        print(f"{parser.prog}: error: {e}", file=sys.stderr)
+        return 1
+
+    return 0
+
+
+def batchMain(
+    parser: argparse.ArgumentParser, args: argparse.Namespace, callpath: str
+) -> int:
+    sources = expandSources(os.path.join(callpath, args.batch))
+    if not sources:
+        print(f"{parser.prog}: error: No Images Found", file=sys.stderr)
+        return 1
+
+    imageFormat = (args.format or "PNG").upper()
+    extension = extensionFor(imageFormat)
+
+    failed = 0
+    bytesRead = 0
+    start = time.perf_counter()
+
+    for done, result in enumerate(runBatch(
+        sources, os.path.join(callpath, args.out_dir), imageFormat,
+        extension, args.operations or [], args.fill, args.workers
+    ), 1):
+        if result.error is not None:
+            failed += 1
+            print(
+                f"[{done}/{len(sources)}] {result.source}: error: \
+{result.error}",
+                file=sys.stderr
+            )
+        else:
+            bytesRead += result.bytesRead
+            print(
+                f"[{done}/{len(sources)}] {result.source} -> {result.target}",
+                file=sys.stderr
+            )
+
+    elapsed = max(time.perf_counter() - start, 1e-6)
+    print(
+        f"Converted {len(sources) - failed} Of {len(sources)} Files In \
+{elapsed:.1f}s ({len(sources) / elapsed:.1f} Files/s, \
+{bytesRead / elapsed / 1e6:.1f} MB/s)",
+        file=sys.stderr
+    )
+
+    return 1 if failed else 0
+
+
+def watchMain(args: argparse.Namespace, callpath: str) -> int:
+    from PyQt5.QtCore import QStandardPaths
+
+    from PyQt5.QtGui import QGuiApplication
+
+    from watcher import ClipboardWatcher
+
+    app = QGuiApplication(sys.argv[:1])
+
+    directory = os.path.join(callpath, args.watch) if args.watch else \
+        os.path.join(
+            QStandardPaths.standardLocations(
+                QStandardPaths.PicturesLocation
+            )[-1],
+            "Clipboard2Image Captures"
+        )
+
+    watcher = ClipboardWatcher(app.clipboard(), directory, args.keep)
+    watcher.captured.connect(lambda path: print(path, flush=True))
+    watcher.countsChanged.connect(
+        lambda captured, deduplicated: print(
+            f"{captured} Captured, {deduplicated} Duplicates",
+            file=sys.stderr
+        )
+    )
+    watcher.failed.connect(
+        lambda e: print(f"clipboard2image: error: {e}", file=sys.stderr)
+    )
+    watcher.start()
+
+    # Qt keeps the interpreter from seeing Ctrl+C while exec() runs, so the
+    # default handler is restored to let the daemon be stopped from a shell.
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    print(
+        f"Watching The Clipboard, Saving To \"{directory}\"", file=sys.stderr
+    )
+
+    return app.exec()
@@ -13,7 +13,6 @@ from PyQt5.QtWidgets import (
     QMessageBox,
     QDialog,
     QDialogButtonBox,
-    QTextBrowser,
     QComboBox,
     QScrollArea,
     QToolBar,
@@ -24,47 +23,52 @@ from PyQt5.QtWidgets import (
     QRadioButton,
     QColorDialog,
     QActionGroup,
-    QSlider
+    QSlider,
+    QProgressBar,
+    QListWidget
 )
 
 from PyQt5.QtCore import (
     QSize,
     QStandardPaths,
-    QBuffer,
+    QThreadPool,
+    QTimer,
     Qt,
     pyqtProperty,
     pyqtSignal,
-    pyqtSlot,
-    PYQT_VERSION_STR,
-    QT_VERSION_STR
+    pyqtSlot
 )
 
 from PyQt5.QtGui import (
     QIcon,
     QKeySequence,
     QCloseEvent,
+    QPaintEvent,
     QPixmap,
-    QTextOption,
+    QImage,
     QColor
 )
 
-from PyQt5.sip import SIP_VERSION_STR
+from PIL import Image, ImageOps, UnidentifiedImageError
 
-from PIL import Image, ImageGrab, ImageOps, ImageQt, UnidentifiedImageError
-from PIL import __version__ as pil_version
+from appdirs import user_cache_dir, user_config_dir
 
-from qt_material import list_themes, apply_stylesheet
-from send2trash import send2trash, TrashPermissionError
-from appdirs import user_config_dir
-from winshell import delete_file
-
-import toml
-
-from io import BytesIO
-
-import subprocess
 import sys
 import os
+import time
+
+from startup import trace
+from stylesheets import StylesheetCache
+from settings import SettingsStore
+from iconbundle import IconBundle
+
+from imagecanvas import DisplayBuffer, ImageCanvas
+from imagecache import DecodedImageCache, ZoomPyramid, checkerboard
+from clipboardimage import imageFromMimeData
+from workers import BatchJob, LoadJob, SaveJob, TransformEngine
+from transforms import fitSize, resizeImage, rotateImage
+from operations import ImageDocument, Resize, Transpose, rotation
+import outofcore
 
 
 class Clipboard2Image(QMainWindow):
@@ -74,6 +78,16 @@ class Clipboard2Image(QMainWindow):
     appThemeName = "Light Blue"
     appIconPath = "icons/appicon.png"
 
+    previewSize = (320, 240,)
+    previewDelay = 150
+    idlePollInterval = 100
+
+    progressiveBytes = 4 << 20
+    progressivePixels = 16_000_000
+
+    historyMemoryBudget = 64
+    historyDiskBudget = 512
+
     supportedFormats = [
         "BMP Image (*.bmp)",
         "DIB Image (*.dib)",
@@ -111,74 +125,136 @@ class Clipboard2Image(QMainWindow):
 
     activeImageChanged = pyqtSignal()
     activeImagePathChanged = pyqtSignal()
+    firstPainted = pyqtSignal()
 
     _activeImage = None
     _activeImagePath = None
-
-    def __init__(self, app: QApplication, callpath: str) -> None:
+    _activeImageVersion = 0
+    _history = None
+
+    displayBuffer = None
+    pendingImage = None
+
+    _painted = False
+
+    windows = []
+    documentCache = DecodedImageCache()
+    settings = SettingsStore(
+        os.path.join(user_config_dir(appTitle), "settings.toml")
+    )
+    icons = IconBundle(
+        "icons/icons8", os.path.join(user_cache_dir(appTitle), "icons.bundle")
+    )
+    stylesheets = StylesheetCache(
+        os.path.join(user_config_dir(appTitle), "stylesheets")
+    )
+
+    def __init__(
+        self, app: QApplication, callpath: str, args: list = None
+    ) -> None:
         super().__init__()
 
         self.app = app
         self.callpath = callpath
+        self.args = sys.argv[1:] if args is None else args
+
+        # Every window lives in the same QApplication; the class keeps them
+        # referenced until Qt deletes them on close.
+        self.setAttribute(Qt.WA_DeleteOnClose)
+        self.windows.append(self)
+        self.destroyed.connect(
+            lambda: self.windows.remove(self) if self in self.windows
+            else None
+        )
+
+        self.saveJobs = []
+        self.loadJobs = []
+        self.loadJob = None
+        self.batchJobs = []
+        self.clipboardWatcher = None
+        self.transformEngine = TransformEngine(self)
+        self.levelEngine = TransformEngine(self)
+        self.copyEngine = TransformEngine(self)
+        self.themedActions = []
 
         self._loadSettings()
+        trace.mark("settings loaded")
+
         self._processArgs()
+        trace.mark("arguments processed")
         self._createWindow()
         self._createMenuBar()
+        trace.mark("menus created")
         self._createWidgets()
         self._createToolBar()
         self._createStatusBar()
         self._createSignalBindings()
+        trace.mark("widgets created")
 
         self.activeImageChanged.emit()
 
     def _loadSettings(self) -> None:
-        settingsFilePath = os.path.join(
-            user_config_dir(self.appTitle), "settings.toml"
+        self.settings.load()
+
+        self.appTheme = self.settings.get("theme", "xml")
+        self.appThemeName = self.settings.get("theme", "name")
+        self.historyMemoryBudget = self.settings.get("history", "memory")
+        self.historyDiskBudget = self.settings.get("history", "disk")
+        self.defaultZoom = min(
+            max(self.settings.get("view", "zoom"), 10), 2000
+        )
+        self.batchWorkers = self.settings.get("batch", "workers") or None
+        self.documentCache.maxImages = self.settings.get("cache", "documents")
+
+        # Images over the ceiling (in megabytes, 0 picks a quarter of the
+        # physical memory) are decoded and edited in scratch files.
+        outofcore.configure(
+            (self.settings.get("memory", "ceiling") << 20) or None,
+            self.settings.get("memory", "scratch") or None,
+            self.settings.get("memory", "pixels")
         )
 
-        if os.path.exists(settingsFilePath):
-            try:
-                with open(settingsFilePath, "r") as settingsFile:
-                    tomlObject = toml.load(settingsFile)
-                    self.appTheme = tomlObject["theme"]["xml"]
-                    self.appThemeName = tomlObject["theme"]["name"]
-            except toml.TomlDecodeError as e:
-                os.remove(settingsFilePath)
-                errorMessage = QMessageBox(
-                    QMessageBox.Warning,
-                    self.appTitle,
-                    "Unable To Parse The Settings File!",
-                    QMessageBox.Ok
-                )
-                errorMessage.setInformativeText(str(e))
-                errorMessage.setWindowIcon(QIcon(self.appIconPath))
-                return errorMessage.exec()
-        else:
-            os.makedirs(os.path.dirname(settingsFilePath), exist_ok=True)
-            with open(settingsFilePath, "w") as settingsFile:
-                settingsDict = {
-                    "theme": {
-                        "xml": self.appTheme,
-                        "name": self.appThemeName
-                    }
-                }
-                toml.dump(settingsDict, settingsFile)
+        self.settings.failed.connect(self.onSettingsWriteFailed)
+
+        # The file is read once per process, so only the first window to
+        # see a broken one reports it; the next write replaces it.
+        if (e := self.settings.loadError) is not None:
+            self.settings.loadError = None
+            errorMessage = QMessageBox(
+                QMessageBox.Warning,
+                self.appTitle,
+                "Unable To Parse The Settings File!",
+                QMessageBox.Ok
+            )
+            errorMessage.setInformativeText(str(e))
+            errorMessage.setWindowIcon(QIcon(self.appIconPath))
+            return errorMessage.exec()
 
     def _processArgs(self) -> None:
         try:
-            if (len(sys.argv) == 3) and (sys.argv[1] == "--theme") and (
-                theme := sys.argv[2].replace('-', '_')+'.xml'
-            ) in list_themes():
-                self.appTheme = theme
-                self.appThemeName = sys.argv[2].replace('-', ' ').title()
-            elif (len(sys.argv) == 2) and (os.path.isfile(
+            if (len(self.args) == 2) and (self.args[0] == "--theme"):
+                if (
+                    theme := self.args[1].replace('-', '_')+'.xml'
+                ) in self.stylesheets.themes():
+                    self.appTheme = theme
+                    self.appThemeName = self.args[1].replace('-', ' ').title()
+
+                    # Forwarded to a running instance, the theme restyles
+                    # the whole application, whose stylesheet every window
+                    # shares, just like a change in the settings.
+                    if len(self.windows) > 1:
+                        self.stylesheets.apply(self.app, theme)
+                        for window in self.windows:
+                            if window is not self:
+                                window.appTheme = self.appTheme
+                                window.appThemeName = self.appThemeName
+                                window._updateThemedIcons()
+            elif (len(self.args) == 1) and (os.path.isfile(
                 path := os.path.join(
-                    self.callpath, sys.argv[1]
+                    self.callpath, self.args[0]
                 )
             )):
-                self.activeImage = Image.open(path)
-                self.activeImagePath = path
+                self._openImage(path)
         except UnidentifiedImageError:
             errorMessage = QMessageBox(
                 QMessageBox.Warning,
@@ -223,12 +299,7 @@ Extension.",
                 zoomPercentageStr = action.text()
                 zoomPercentage = int(action.text().removesuffix("%"))
 
-                self.imageViewLabel.setPixmap(QPixmap.fromImage(
-                    ImageQt.ImageQt(self.activeImage.convert("RGBA"))
-                ).scaled(
-                    self.activeImage.size[0] * zoomPercentage / 100,
-                    self.activeImage.size[1] * zoomPercentage / 100
-                ))
+                self.imageCanvas.setZoom(zoomPercentage)
 
                 self.imageZoom.setText(zoomPercentageStr)
             else:
@@ -236,12 +307,7 @@ Extension.",
                     zoomPercentageStr = str(zoomDialogSlider.value()) + "%"
                     zoomPercentage = zoomDialogSlider.value()
 
-                    self.imageViewLabel.setPixmap(QPixmap.fromImage(
-                        ImageQt.ImageQt(self.activeImage.convert("RGBA"))
-                    ).scaled(
-                        self.activeImage.size[0] * zoomPercentage / 100,
-                        self.activeImage.size[1] * zoomPercentage / 100
-                    ))
+                    self.imageCanvas.setZoom(zoomPercentage)
 
                     self.imageZoom.setText(zoomPercentageStr)
 
@@ -291,75 +357,62 @@ Extension.",
         helpMenu = QMenu("Help", self)
 
         newWindowAction = QAction("New Window", self)
-        newWindowAction.setIcon(QIcon(
-            "icons/icons8/icons8-new-window-50.png"
-            if self.appTheme.startswith('light') else
-            "icons/icons8/icons8-new-window-white-50.png"
-        ))
+        self._setThemedIcon(newWindowAction, "new-window")
         newWindowAction.setShortcut(QKeySequence.New)
         newWindowAction.triggered.connect(self.onNewWindowActionTriggered)
 
         self.pasteAction = QAction("Paste", self)
-        self.pasteAction.setIcon(QIcon(
-            "icons/icons8/icons8-paste-50.png"
-            if self.appTheme.startswith('light') else
-            "icons/icons8/icons8-paste-white-50.png"
-        ))
+        self._setThemedIcon(self.pasteAction, "paste")
         self.pasteAction.setShortcut(QKeySequence.Paste)
         self.pasteAction.triggered.connect(self.imagePasted)
 
         self.openAction = QAction("Open", self)
-        self.openAction.setIcon(QIcon(
-            "icons/icons8/icons8-folder-50.png"
-            if self.appTheme.startswith('light') else
-            "icons/icons8/icons8-folder-white-50.png"
-        ))
+        self._setThemedIcon(self.openAction, "folder")
         self.openAction.setShortcut(QKeySequence.Open)
         self.openAction.triggered.connect(self.onOpenActionTriggered)
 
+        batchAction = QAction("Batch Convert", self)
+        self._setThemedIcon(batchAction, "save-as")
+        batchAction.setShortcut(Qt.CTRL+Qt.Key_B)
+        batchAction.triggered.connect(self.onBatchActionTriggered)
+
+        self.watchAction = QAction("Watch Clipboard", self)
+        self._setThemedIcon(self.watchAction, "paste")
+        self.watchAction.setCheckable(True)
+        self.watchAction.setShortcut(Qt.CTRL+Qt.SHIFT+Qt.Key_W)
+        self.watchAction.toggled.connect(self.onWatchActionToggled)
+
         self.deleteAction = QAction("Delete", self)
-        self.deleteAction.setIcon(QIcon(
-            "icons/icons8/icons8-delete-bin-50.png"
-            if self.appTheme.startswith('light') else
-            "icons/icons8/icons8-delete-bin-white-50.png"
-        ))
+        self._setThemedIcon(self.deleteAction, "delete-bin")
         self.deleteAction.setEnabled(self.activeImagePath is not None)
         self.deleteAction.setShortcut(QKeySequence.Delete)
         self.deleteAction.triggered.connect(self.onDeleteActionTriggered)
 
         exitAction = QAction("Exit", self)
-        exitAction.setIcon(QIcon(
-            "icons/icons8/icons8-exit-50.png"
-            if self.appTheme.startswith('light') else
-            "icons/icons8/icons8-exit-white-50.png"
-        ))
+        self._setThemedIcon(exitAction, "exit")
         exitAction.setShortcut(Qt.CTRL+Qt.Key_Q)
         exitAction.triggered.connect(self.close)
 
         settingsAction = QAction("Settings", self)
-        settingsAction.setIcon(QIcon(
-            "icons/icons8/icons8-settings-50.png"
-            if self.appTheme.startswith('light') else
-            "icons/icons8/icons8-settings-white-50.png"
-        ))
+        self._setThemedIcon(settingsAction, "settings")
         settingsAction.setShortcut(Qt.ALT+Qt.SHIFT+Qt.Key_S)
         settingsAction.triggered.connect(self.onSettingsActionTriggered)
 
         self.backAction = QAction("Back", self)
-        self.backAction.setIcon(QIcon(
-            "icons/icons8/icons8-back-50.png"
-            if self.appTheme.startswith('light') else
-            "icons/icons8/icons8-back-white-50.png"
-        ))
+        self._setThemedIcon(self.backAction, "back")
         self.backAction.setShortcut(QKeySequence.Back)
         self.backAction.triggered.connect(self.onBackActionTriggered)
 
+        self.undoAction = QAction("Undo", self)
+        self.undoAction.setShortcut(QKeySequence.Undo)
+        self.undoAction.triggered.connect(self.onUndoActionTriggered)
+
+        self.redoAction = QAction("Redo", self)
+        self.redoAction.setShortcut(QKeySequence.Redo)
+        self.redoAction.triggered.connect(self.onRedoActionTriggered)
+
         zoomActionMenu = QMenu("Zoom", self.imageMenu)
-        zoomActionMenu.setIcon(QIcon(
-            "icons/icons8/icons8-zoom-mode-50.png"
-            if self.appTheme.startswith('light') else
-            "icons/icons8/icons8-zoom-mode-white-50.png"
-        ))
+        self._setThemedIcon(zoomActionMenu.menuAction(), "zoom-mode")
 
         self.zoomActionGroup = QActionGroup(zoomActionMenu)
 
@@ -391,8 +444,6 @@ Extension.",
         zoom1000Percent.setCheckable(True)
         zoom2000Percent.setCheckable(True)
 
-        zoom100Percent.setChecked(True)
-
         zoomActionMenu.addAction(self.zoomCustom)
         zoomActionMenu.addSeparator()
         zoomActionMenu.addAction(zoom10Percent)
@@ -422,61 +473,49 @@ Extension.",
         self.zoomActionGroup.addAction(zoom1000Percent)
         self.zoomActionGroup.addAction(zoom2000Percent)
 
+        for action in self.zoomActionGroup.actions():
+            if action.text() == f"{self.defaultZoom}%":
+                action.setChecked(True)
+                break
+        else:
+            self.zoomCustom.setChecked(True)
+
         self.zoomActionGroup.triggered.connect(__zoomSize)
 
         self.copyAction = QAction("Copy To Clipboard", self)
-        self.copyAction.setIcon(QIcon(
-            "icons/icons8/icons8-copy-50.png"
-            if self.appTheme.startswith('light') else
-            "icons/icons8/icons8-copy-white-50.png"
-        ))
+        self._setThemedIcon(self.copyAction, "copy")
         self.copyAction.setShortcut(QKeySequence.Copy)
         self.copyAction.triggered.connect(self.onCopyActionTriggered)
 
         self.saveAction = QAction("Save", self)
-        self.saveAction.setIcon(QIcon(
-            "icons/icons8/icons8-save-50.png"
-            if self.appTheme.startswith('light') else
-            "icons/icons8/icons8-save-white-50.png"
-        ))
+        self._setThemedIcon(self.saveAction, "save")
         self.saveAction.setShortcut(QKeySequence.Save)
         self.saveAction.triggered.connect(self.onSaveActionTriggered)
 
         self.saveAsAction = QAction("Save As", self)
-        self.saveAsAction.setIcon(QIcon(
-            "icons/icons8/icons8-save-as-50.png"
-            if self.appTheme.startswith('light') else
-            "icons/icons8/icons8-save-as-white-50.png"
-        ))
+        self._setThemedIcon(self.saveAsAction, "save-as")
         self.saveAsAction.setShortcut(Qt.CTRL+Qt.SHIFT+Qt.Key_S)
         self.saveAsAction.triggered.connect(self.onSaveAsActionTriggered)
 
+        self.exportAction = QAction("Export", self)
+        self._setThemedIcon(self.exportAction, "save-as")
+        self.exportAction.setShortcut(Qt.CTRL+Qt.Key_E)
+        self.exportAction.triggered.connect(self.onExportActionTriggered)
+
         self.resizeAction = QAction("Resize", self)
-        self.resizeAction.setIcon(QIcon(
-            "icons/icons8/icons8-resize-50.png"
-            if self.appTheme.startswith('light') else
-            "icons/icons8/icons8-resize-white-50.png"
-        ))
+        self._setThemedIcon(self.resizeAction, "resize")
         self.resizeAction.setShortcut(Qt.CTRL+Qt.Key_R)
         self.resizeAction.triggered.connect(self.onResizeActionTriggered)
 
         self.rotateAction = QAction("Rotate", self)
-        self.rotateAction.setIcon(QIcon(
-            "icons/icons8/icons8-rotate-50.png"
-            if self.appTheme.startswith('light') else
-            "icons/icons8/icons8-rotate-white-50.png"
-        ))
+        self._setThemedIcon(self.rotateAction, "rotate")
         self.rotateAction.setShortcut(Qt.CTRL+Qt.SHIFT+Qt.Key_R)
         self.rotateAction.triggered.connect(self.onRotateActionTriggered)
 
         self.rotateRightAction = QAction(
             "Rotate 90 Degrees To The Right", self
         )
-        self.rotateRightAction.setIcon(QIcon(
-            "icons/icons8/icons8-rotate-right-50.png"
-            if self.appTheme.startswith('light') else
-            "icons/icons8/icons8-rotate-right-white-50.png"
-        ))
+        self._setThemedIcon(self.rotateRightAction, "rotate-right")
         self.rotateRightAction.setShortcut(Qt.ALT+Qt.SHIFT+Qt.Key_R)
         self.rotateRightAction.triggered.connect(
             self.onRotateRightActionTriggered
@@ -486,40 +525,24 @@ Extension.",
             "Rotate 90 Degrees To The Left",
             self
         )
-        self.rotateLeftAction.setIcon(QIcon(
-            "icons/icons8/icons8-rotate-left-50.png"
-            if self.appTheme.startswith('light') else
-            "icons/icons8/icons8-rotate-left-white-50.png"
-        ))
+        self._setThemedIcon(self.rotateLeftAction, "rotate-left")
         self.rotateLeftAction.setShortcut(Qt.ALT+Qt.SHIFT+Qt.Key_L)
         self.rotateLeftAction.triggered.connect(
             self.onRotateLeftActionTriggered
         )
 
         aboutAction = QAction("About", self)
-        aboutAction.setIcon(QIcon(
-            "icons/icons8/icons8-about-50.png"
-            if self.appTheme.startswith('light') else
-            "icons/icons8/icons8-about-white-50.png"
-        ))
+        self._setThemedIcon(aboutAction, "about")
         aboutAction.setShortcut(Qt.CTRL+Qt.SHIFT+Qt.Key_A)
         aboutAction.triggered.connect(self.onAboutActionTriggered)
 
         licenseAction = QAction("License", self)
-        licenseAction.setIcon(QIcon(
-            "icons/icons8/icons8-software-license-50.png"
-            if self.appTheme.startswith('light') else
-            "icons/icons8/icons8-software-license-white-50.png"
-        ))
+        self._setThemedIcon(licenseAction, "software-license")
         licenseAction.setShortcut(Qt.CTRL+Qt.SHIFT+Qt.Key_L)
         licenseAction.triggered.connect(self.onLicenseActionTriggered)
 
         devInfoAction = QAction("Developer Info", self)
-        devInfoAction.setIcon(QIcon(
-            "icons/icons8/icons8-code-50.png"
-            if self.appTheme.startswith('light') else
-            "icons/icons8/icons8-code-white-50.png"
-        ))
+        self._setThemedIcon(devInfoAction, "code")
         devInfoAction.setShortcut(Qt.CTRL+Qt.SHIFT+Qt.Key_D)
         devInfoAction.triggered.connect(self.onDevInfoActionTriggered)
 
@@ -527,6 +550,8 @@ Extension.",
         fileMenu.addSeparator()
         fileMenu.addAction(self.pasteAction)
         fileMenu.addAction(self.openAction)
+        fileMenu.addAction(batchAction)
+        fileMenu.addAction(self.watchAction)
         fileMenu.addAction(self.deleteAction)
         fileMenu.addSeparator()
         fileMenu.addAction(exitAction)
@@ -535,11 +560,15 @@ Extension.",
 
         self.imageMenu.addAction(self.backAction)
         self.imageMenu.addSeparator()
+        self.imageMenu.addAction(self.undoAction)
+        self.imageMenu.addAction(self.redoAction)
+        self.imageMenu.addSeparator()
         self.imageMenu.addMenu(zoomActionMenu)
         self.imageMenu.addSeparator()
         self.imageMenu.addAction(self.copyAction)
         self.imageMenu.addAction(self.saveAction)
         self.imageMenu.addAction(self.saveAsAction)
+        self.imageMenu.addAction(self.exportAction)
         self.imageMenu.addSeparator()
         self.imageMenu.addAction(self.resizeAction)
         self.imageMenu.addAction(self.rotateAction)
@@ -557,6 +586,23 @@ Extension.",
 
         self.setMenuBar(menuBar)
 
+    def _themedIcon(self, name: str) -> QIcon:
+        return self.icons.icon(
+            f"icons8-{name}-50.png"
+            if self.appTheme.startswith('light') else
+            f"icons8-{name}-white-50.png"
+        )
+
+    def _setThemedIcon(self, action: QAction, name: str) -> None:
+        self.themedActions.append((action, name,))
+        action.setIcon(self._themedIcon(name))
+
+    def _updateThemedIcons(self) -> None:
+        # A theme change only swaps the icons of the existing actions, the
+        # menus, the toolbar and the image on the canvas stay as they are.
+        for action, name in self.themedActions:
+            action.setIcon(self._themedIcon(name))
+
     def _createWidgets(self) -> None:
         def __zoomClicked():
             self.zoomCustom.setChecked(True)
@@ -600,12 +646,13 @@ Button (Ctrl + O).""", homeWidget
         imageViewLayout.setAlignment(Qt.AlignCenter)
 
         self.imageViewScrollArea = QScrollArea(imageViewWidget)
-        self.imageViewScrollArea.setWidgetResizable(True)
+        self.imageViewScrollArea.setWidgetResizable(False)
+        self.imageViewScrollArea.setAlignment(Qt.AlignCenter)
 
-        self.imageViewLabel = QLabel(self.imageViewScrollArea)
-        self.imageViewLabel.setAlignment(Qt.AlignCenter)
+        self.imageCanvas = ImageCanvas(self.imageViewScrollArea)
+        self.imageCanvas.setZoom(self.defaultZoom)
 
-        self.imageViewScrollArea.setWidget(self.imageViewLabel)
+        self.imageViewScrollArea.setWidget(self.imageCanvas)
 
         imageViewZoom = QPushButton("Zoom", imageViewWidget)
         imageViewZoom.clicked.connect(__zoomClicked)
@@ -639,10 +686,35 @@ Button (Ctrl + O).""", homeWidget
     def _createStatusBar(self) -> None:
         self.statusBar = QStatusBar(self)
 
-        self.imageZoom = QLabel("100%", self.statusBar)
+        self.imageZoom = QLabel(f"{self.defaultZoom}%", self.statusBar)
         self.imageDimensions = QLabel(self.statusBar)
         self.imageFormat = QLabel(self.statusBar)
 
+        self.saveProgress = QLabel(self.statusBar)
+        self.saveProgress.hide()
+
+        self.saveCancel = QPushButton("Cancel", self.statusBar)
+        self.saveCancel.clicked.connect(self.onSaveCancelClicked)
+        self.saveCancel.hide()
+
+        self.watchCounts = QLabel(self.statusBar)
+        self.watchCounts.hide()
+
+        self.transformProgress = QProgressBar(self.statusBar)
+        self.transformProgress.setRange(0, 100)
+        self.transformProgress.setMaximumWidth(150)
+        self.transformProgress.hide()
+
+        self.loadProgress = QProgressBar(self.statusBar)
+        self.loadProgress.setRange(0, 100)
+        self.loadProgress.setMaximumWidth(150)
+        self.loadProgress.hide()
+
+        self.statusBar.addPermanentWidget(self.watchCounts)
+        self.statusBar.addPermanentWidget(self.transformProgress)
+        self.statusBar.addPermanentWidget(self.loadProgress)
+        self.statusBar.addPermanentWidget(self.saveProgress)
+        self.statusBar.addPermanentWidget(self.saveCancel)
         self.statusBar.addPermanentWidget(QLabel("Ready", self.statusBar))
         self.statusBar.insertPermanentWidget(0, self.imageZoom)
         self.statusBar.insertPermanentWidget(1, self.imageDimensions)
@@ -652,25 +724,442 @@ Button (Ctrl + O).""", homeWidget
     def _createSignalBindings(self) -> None:
         self.activeImageChanged.connect(self.onActiveImageChanged)
         self.activeImagePathChanged.connect(self.onActiveImagePathChanged)
+        self.transformEngine.busyChanged.connect(self.onTransformBusyChanged)
+        self.transformEngine.progress.connect(self.transformProgress.setValue)
+        self.transformEngine.finished.connect(self.onTransformFinished)
+        self.transformEngine.failed.connect(self.onTransformFailed)
+        self.imageCanvas.levelRequested.connect(self.onLevelRequested)
+        self.levelEngine.finished.connect(self.onLevelFinished)
+        self.levelEngine.failed.connect(self.onTransformFailed)
+        self.copyEngine.finished.connect(self.onCopyFinished)
+        self.copyEngine.failed.connect(self.onTransformFailed)
+
+    def paintEvent(self, event: QPaintEvent) -> None:
+        super().paintEvent(event)
+
+        # Signalled from the event loop, so listeners run once the first
+        # frame is on screen rather than in the middle of painting it.
+        if not self._painted:
+            self._painted = True
+            QTimer.singleShot(0, self.firstPainted.emit)
 
     def closeEvent(self, event: QCloseEvent) -> None:
         event.ignore()
-        exitConfirmation = QMessageBox(
-            QMessageBox.Warning,
-            self.appTitle,
-            f"Are You Sure You Want To Exit {self.appTitle}?",
-            QMessageBox.Yes | QMessageBox.No,
-            self
-        ).exec()
+
+        # Closing one of several windows leaves the application running, so
+        # only the last window asks before it exits.
+        if any(
+            window is not self and window.isVisible()
+            for window in self.windows
+        ):
+            exitConfirmation = QMessageBox.Yes
+        else:
+            exitConfirmation = QMessageBox(
+                QMessageBox.Warning,
+                self.appTitle,
+                f"Are You Sure You Want To Exit {self.appTitle}?",
+                QMessageBox.Yes | QMessageBox.No,
+                self
+            ).exec()
         if exitConfirmation == QMessageBox.Yes:
+            self._cancelLoad()
+            for engine in self.findChildren(TransformEngine):
+                engine.cancel()
+            for job in self.batchJobs:
+                job.cancel()
+            if self._history is not None:
+                self._history.clear()
+            if self.clipboardWatcher is not None:
+                self.clipboardWatcher.stop()
+                self.clipboardWatcher.waitForDone()
+
+            # Jobs call back into the window when they end, so it is only
+            # deleted once the last one has; saves are left to finish so
+            # that no file is left half written.
+            if self._hasRunningJobs():
+                self.setAttribute(Qt.WA_DeleteOnClose, False)
+                self._deleteWhenIdle()
             event.accept()
 
+    def _hasRunningJobs(self) -> bool:
+        return bool(
+            self.saveJobs or self.loadJobs or self.batchJobs
+            or any(
+                engine.hasRunningJobs()
+                for engine in self.findChildren(TransformEngine)
+            )
+        )
+
+    def _deleteWhenIdle(self) -> None:
+        if self._hasRunningJobs():
+            QTimer.singleShot(self.idlePollInterval, self._deleteWhenIdle)
+        else:
+            self.deleteLater()
+
+    @pyqtSlot()
+    def onNewWindowActionTriggered(self) -> None:
+        self.newWindow(self.app, self.callpath, [])
+
+    @classmethod
+    def newWindow(
+        cls, app: QApplication, callpath: str, args: list = None
+    ) -> "Clipboard2Image":
+        window = cls(app, callpath, args)
+        window.show()
+        window.raise_()
+        window.activateWindow()
+        return window
+
+    def _openImage(self, path: str) -> None:
+        document = self.documentCache.get(path)
+        if document is None:
+            image = outofcore.openImage(path)
+            if self._loadsProgressively(path, image):
+                image.close()
+
+                # Started from the event loop, so a file given on the command
+                # line streams into a window that has been fully built.
+                return QTimer.singleShot(
+                    0, lambda: self._startLoad(path, image.size)
+                )
+
+            document = ImageDocument(image)
+            self.documentCache.put(path, document)
+
+        # A shared document is a new image for this window all the same.
+        self.history.clear()
+        self.activeImage = document
+        self.activeImagePath = path
+
+    def _loadsProgressively(self, path: str, image: Image.Image) -> bool:
+        if outofcore.exceeds(image.mode, image.size):
+            return True
+
+        # Zoomed out JPEGs decode a reduced level straight from the file,
+        # which is quicker than streaming in the full resolution.
+        zoom = (
+            self.imageCanvas.zoom() if hasattr(self, "imageCanvas")
+            else self.defaultZoom
+        )
+        if image.format in ZoomPyramid.draftFormats and zoom < 100:
+            return False
+        return (
+            os.path.getsize(path) >= self.progressiveBytes
+            or image.size[0] * image.size[1] >= self.progressivePixels
+        )
+
+    def _startLoad(self, path: str, size: tuple) -> LoadJob:
+        def __loadPreview(preview: Image.Image) -> None:
+            if loadJob is not self.loadJob:
+                return
+            self.imageCanvas.setPreview(preview, size)
+            self.centralWidget.setCurrentIndex(1)
+
+        def __loadFinished(image: Image.Image) -> None:
+            __loadDone()
+            if loadJob is not self.loadJob:
+                return
+            self.loadJob = None
+
+            document = ImageDocument(image)
+            self.documentCache.put(path, document)
+
+            self.history.clear()
+            self.activeImage = document
+            self.activeImagePath = path
+
+        def __loadFailed(e: Exception) -> None:
+            __loadDone()
+            if loadJob is not self.loadJob:
+                return
+            self.loadJob = None
+
+            # Whatever was shown before the load started comes back.
+            self.activeImageChanged.emit()
+
+            errorMessage = QMessageBox(
+                QMessageBox.Warning,
+                self.appTitle,
+                "Unable To Open Your Image!",
+                QMessageBox.Ok
+            )
+            errorMessage.setWindowIcon(QIcon(self.appIconPath))
+            errorMessage.setInformativeText(str(e))
+            return errorMessage.exec()
+
+        def __loadDone() -> None:
+            self.loadJobs.remove(loadJob)
+            if loadJob is self.loadJob:
+                self.loadProgress.hide()
+
+        self._cancelLoad()
+
+        loadJob = LoadJob(path)
+        loadJob.signals.progress.connect(self.loadProgress.setValue)
+        loadJob.signals.preview.connect(__loadPreview)
+        loadJob.signals.finished.connect(__loadFinished)
+        loadJob.signals.failed.connect(__loadFailed)
+        loadJob.signals.cancelled.connect(__loadDone)
+
+        self.loadJob = loadJob
+        self.loadJobs.append(loadJob)
+        self.loadProgress.setValue(0)
+        self.loadProgress.show()
+        self.statusBar.showMessage(f"Opening {path}...", 2000)
+
+        QThreadPool.globalInstance().start(loadJob)
+
+        return loadJob
+
+    def _cancelLoad(self) -> None:
+        if self.loadJob is not None:
+            self.loadJob.cancel()
+            self.loadJob = None
+            self.loadProgress.hide()
+
     @pyqtSlot()
-    def onNewWindowActionTriggered(_) -> None:
-        if not getattr(sys, "frozen", False):
-            subprocess.Popen([sys.executable, sys.argv[0]])
+    def onBatchActionTriggered(self) -> None:
+        from batch import expandSources, parseSize
+
+        def __browse(field: QLineEdit, title: str) -> None:
+            if directory := QFileDialog.getExistingDirectory(
+                batchDialog, title, field.text()
+            ):
+                field.setText(directory)
+
+        def __pipeline() -> list:
+            pipeline = []
+            if sizeText := batchDialogSizeField.text().strip():
+                pipeline.append(("--resize", parseSize(sizeText),))
+            if angleText := batchDialogAngleField.text().strip():
+                pipeline.append(("--rotate", float(angleText),))
+            return pipeline
+
+        def __startBatch() -> None:
+            nonlocal batchJob
+
+            try:
+                sources = expandSources(batchDialogSourceField.text())
+                if not sources:
+                    raise ValueError("No Images Found In The Source!")
+                if not batchDialogTargetField.text():
+                    raise ValueError("Please Select An Output Folder!")
+
+                extension = batchDialogFormat.currentText().rsplit(
+                    "*", 1
+                )[-1].rstrip(")")
+                imageFormat = Image.registered_extensions().get(extension)
+                if imageFormat is None:
+                    raise ValueError(
+                        f"Unknown File Extension: \"{extension}\""
+                    )
+                pipeline = __pipeline()
+            except ValueError as e:
+                errorMessage = QMessageBox(
+                    QMessageBox.Warning,
+                    self.appTitle,
+                    "Invalid Value Entered! Please Enter A Valid Value.",
+                    QMessageBox.Ok
+                )
+                errorMessage.setInformativeText(str(e))
+                errorMessage.setWindowIcon(QIcon(self.appIconPath))
+                return errorMessage.exec()
+
+            batchDialogResults.clear()
+            batchDialogProgress.setRange(0, len(sources))
+            batchDialogProgress.setValue(0)
+            batchDialogSummary.setText(f"Converting {len(sources)} Files...")
+            batchDialogStart.setEnabled(False)
+
+            batchJob = BatchJob(
+                sources, batchDialogTargetField.text(), imageFormat,
+                extension, pipeline, workers=self.batchWorkers
+            )
+            batchJob.signals.result.connect(__batchResult)
+            batchJob.signals.progress.connect(batchDialogProgress.setValue)
+            batchJob.signals.finished.connect(__batchFinished)
+            batchJob.signals.failed.connect(__batchFailed)
+            batchJob.signals.cancelled.connect(__batchCancelled)
+            self.batchJobs.append(batchJob)
+
+            BatchJob.pool().start(batchJob)
+
+        def __batchResult(result) -> None:
+            batchDialogResults.addItem(
+                f"{os.path.basename(result.source)}: {result.error}"
+                if result.error is not None else
+                f"{os.path.basename(result.source)} → \
+{os.path.basename(result.target)}"
+            )
+            batchDialogResults.scrollToBottom()
+
+        def __batchFinished(summary: tuple) -> None:
+            converted, failed, bytesRead, elapsed = summary
+            elapsed = max(elapsed, 1e-6)
+            batchDialogSummary.setText(
+                f"Converted {converted} Of {converted + failed} Files In \
+{elapsed:.1f}s ({(converted + failed) / elapsed:.1f} Files/s, \
+{bytesRead / elapsed / 1e6:.1f} MB/s)"
+            )
+            __batchDone()
+
+        def __batchFailed(e: Exception) -> None:
+            batchDialogSummary.setText(f"Batch Failed: {e}")
+            __batchDone()
+
+        def __batchCancelled() -> None:
+            batchDialogSummary.setText("Batch Cancelled")
+            __batchDone()
+
+        def __batchDone() -> None:
+            nonlocal batchJob
+
+            if batchJob in self.batchJobs:
+                self.batchJobs.remove(batchJob)
+            batchJob = None
+            batchDialogStart.setEnabled(True)
+
+        batchJob = None
+
+        batchDialog = QDialog(self)
+
+        batchDialogLayout = QVBoxLayout(batchDialog)
+
+        batchDialogSource = QWidget(batchDialog)
+        batchDialogSourceLayout = QHBoxLayout(batchDialogSource)
+        batchDialogSourceField = QLineEdit(batchDialogSource)
+        batchDialogSourceField.setPlaceholderText("Folder Or Glob Pattern")
+        batchDialogSourceBrowse = QPushButton("Browse", batchDialogSource)
+        batchDialogSourceBrowse.clicked.connect(
+            lambda: __browse(batchDialogSourceField, "Select Source Folder")
+        )
+        batchDialogSourceLayout.addWidget(
+            QLabel("Source:", batchDialogSource)
+        )
+        batchDialogSourceLayout.addSpacing(10)
+        batchDialogSourceLayout.addWidget(batchDialogSourceField)
+        batchDialogSourceLayout.addWidget(batchDialogSourceBrowse)
+        batchDialogSource.setLayout(batchDialogSourceLayout)
+
+        batchDialogTarget = QWidget(batchDialog)
+        batchDialogTargetLayout = QHBoxLayout(batchDialogTarget)
+        batchDialogTargetField = QLineEdit(batchDialogTarget)
+        batchDialogTargetBrowse = QPushButton("Browse", batchDialogTarget)
+        batchDialogTargetBrowse.clicked.connect(
+            lambda: __browse(batchDialogTargetField, "Select Output Folder")
+        )
+        batchDialogTargetLayout.addWidget(
+            QLabel("Output:", batchDialogTarget)
+        )
+        batchDialogTargetLayout.addSpacing(10)
+        batchDialogTargetLayout.addWidget(batchDialogTargetField)
+        batchDialogTargetLayout.addWidget(batchDialogTargetBrowse)
+        batchDialogTarget.setLayout(batchDialogTargetLayout)
+
+        batchDialogFormat = QComboBox(batchDialog)
+        batchDialogFormat.addItems(self.supportedFormats)
+        batchDialogFormat.setCurrentText("PNG Image (*.png)")
+
+        batchDialogSizeField = QLineEdit(batchDialog)
+        batchDialogSizeField.setPlaceholderText(
+            "Size (800x600, 800x, x600 Or 50%) - Leave Empty To Keep"
+        )
+
+        batchDialogAngleField = QLineEdit(batchDialog)
+        batchDialogAngleField.setPlaceholderText(
+            "Rotation In Degrees - Leave Empty To Keep"
+        )
+
+        batchDialogProgress = QProgressBar(batchDialog)
+        batchDialogProgress.setValue(0)
+
+        batchDialogResults = QListWidget(batchDialog)
+
+        batchDialogSummary = QLabel(batchDialog)
+        batchDialogSummary.setAlignment(Qt.AlignCenter)
+
+        batchDialogButtons = QDialogButtonBox(
+            QDialogButtonBox.Ok | QDialogButtonBox.Close,
+            batchDialog
+        )
+        batchDialogStart = batchDialogButtons.button(QDialogButtonBox.Ok)
+        batchDialogStart.setText("Convert")
+        batchDialogButtons.accepted.connect(__startBatch)
+        batchDialogButtons.rejected.connect(batchDialog.close)
+
+        batchDialogLayout.addWidget(batchDialogSource)
+        batchDialogLayout.addWidget(batchDialogTarget)
+        batchDialogLayout.addWidget(batchDialogFormat)
+        batchDialogLayout.addWidget(batchDialogSizeField)
+        batchDialogLayout.addWidget(batchDialogAngleField)
+        batchDialogLayout.addWidget(batchDialogProgress)
+        batchDialogLayout.addWidget(batchDialogResults)
+        batchDialogLayout.addWidget(batchDialogSummary)
+        batchDialogLayout.addSpacing(25)
+        batchDialogLayout.addWidget(batchDialogButtons)
+
+        batchDialog.setWindowTitle(self.appTitle)
+        batchDialog.setWindowIcon(QIcon(self.appIconPath))
+        batchDialog.setLayout(batchDialogLayout)
+
+        batchDialog.resize(500, 550)
+        batchDialog.exec()
+
+        if batchJob is not None:
+            batchJob.cancel()
+
+    @pyqtSlot(bool)
+    def onWatchActionToggled(self, watching: bool) -> None:
+        if self.clipboardWatcher is None:
+            from watcher import ClipboardWatcher
+
+            self.clipboardWatcher = ClipboardWatcher(
+                self.app.clipboard(),
+                os.path.join(
+                    QStandardPaths.standardLocations(
+                        QStandardPaths.PicturesLocation
+                    )[-1],
+                    f"{self.appTitle} Captures"
+                ),
+                parent=self
+            )
+            self.clipboardWatcher.countsChanged.connect(
+                self.onWatchCountsChanged
+            )
+            self.clipboardWatcher.captured.connect(
+                lambda path: self.statusBar.showMessage(
+                    f"Clipboard Captured To \"{path}\"", 2000
+                )
+            )
+
+        if watching:
+            try:
+                self.clipboardWatcher.start()
+            except OSError as e:
+                self.watchAction.setChecked(False)
+                errorMessage = QMessageBox(
+                    QMessageBox.Warning,
+                    self.appTitle,
+                    "Unable To Watch The Clipboard!",
+                    QMessageBox.Ok
+                )
+                errorMessage.setInformativeText(str(e))
+                errorMessage.setWindowIcon(QIcon(self.appIconPath))
+                return errorMessage.exec()
+            self.onWatchCountsChanged(
+                self.clipboardWatcher.capturedCount,
+                self.clipboardWatcher.deduplicatedCount
+            )
+            self.watchCounts.show()
         else:
-            subprocess.Popen([sys.executable])
+            self.clipboardWatcher.stop()
+            self.watchCounts.hide()
+
+    @pyqtSlot(int, int)
+    def onWatchCountsChanged(self, captured: int, deduplicated: int) -> None:
+        self.watchCounts.setText(
+            f"Watching: {captured} Captured, {deduplicated} Duplicates"
+        )
 
     @pyqtSlot()
     def onOpenActionTriggered(self) -> None:
@@ -685,10 +1174,11 @@ Button (Ctrl + O).""", homeWidget
 ({' '.join(self.supportedExtensions)});;{';;'.join(self.supportedFormats)}\
 ;;All Files (*)"
             )
-            self.activeImage = (
-                Image.open(imageFile[0]) if imageFile[0] else None
-            )
-            self.activeImagePath = imageFile[0] if imageFile[0] else None
+            if imageFile[0]:
+                self._openImage(imageFile[0])
+            else:
+                self.activeImage = None
+                self.activeImagePath = None
         except UnidentifiedImageError:
             errorMessage = QMessageBox(
                 QMessageBox.Warning,
@@ -713,6 +1203,10 @@ Extension.",
 
     @pyqtSlot()
     def onDeleteActionTriggered(self) -> None:
+        # Trash support is platform specific and rarely needed, so it is
+        # only imported the first time a file is deleted.
+        from send2trash import send2trash, TrashPermissionError
+
         try:
             errorMessage = QMessageBox(
                 QMessageBox.Warning,
@@ -725,6 +1219,8 @@ To The Recycle Bin!",
 
             if errorMessage.exec() == QMessageBox.Yes:
                 if sys.platform == "win32":
+                    from winshell import delete_file
+
                     delete_file(self.activeImagePath)
                 else:
                     send2trash(self.activeImagePath)
@@ -770,68 +1266,17 @@ To The Recycle Bin!",
             selectedThemeName = settingsDialogThemeSetting.currentText()
             selectedTheme = selectedThemeName.replace(' ', '_').lower()+'.xml'
 
-            apply_stylesheet(self.app, theme=selectedTheme)
-
-            with open("style/style.qss", "r") as stylesheet:
-                self.app.setStyleSheet(
-                    self.app.styleSheet() + stylesheet.read().format(
-                        **os.environ
-                    )
-                )
-
-            self.appThemeName = selectedThemeName
-            self.appTheme = selectedTheme
+            self.stylesheets.apply(self.app, selectedTheme)
 
-            settingsFilePath = os.path.join(
-                user_config_dir(self.appTitle), "settings.toml"
-            )
-            try:
-                if os.path.exists(settingsFilePath):
-                    with open(settingsFilePath, "r") as settingsFile:
-                        try:
-                            tomlObject = toml.load(settingsFile)
-                        except toml.TomlDecodeError as e:
-                            os.remove(settingsFilePath)
-                            errorMessage = QMessageBox(
-                                QMessageBox.Warning,
-                                self.appTitle,
-                                "Unable To Parse The Settings File!",
-                                QMessageBox.Ok
-                            )
-                            errorMessage.setInformativeText(str(e))
-                            errorMessage.setWindowIcon(QIcon(self.appIconPath))
-                            return errorMessage.exec()
-
-                    with open(settingsFilePath, "w") as settingsFile:
-                        tomlObject["theme"]["xml"] = selectedTheme
-                        tomlObject["theme"]["name"] = selectedThemeName
-                        toml.dump(tomlObject, settingsFile)
-                else:
-                    os.makedirs(os.path.dirname(
-                        settingsFilePath), exist_ok=True)
-                    with open(settingsFilePath, "w") as settingsFile:
-                        settingsDict = {
-                            "theme": {
-                                "xml": selectedTheme,
-                                "name": selectedThemeName
-                            }
-                        }
-                        toml.dump(settingsDict, settingsFile)
-            except OSError as e:
-                errorMessage = QMessageBox(
-                    QMessageBox.Warning,
-                    self.appTitle,
-                    "Unable To Open The Settings File!",
-                    QMessageBox.Ok
-                )
-                errorMessage.setInformativeText(str(e))
-                errorMessage.setWindowIcon(QIcon(self.appIconPath))
-                return errorMessage.exec()
+            # The stylesheet is shared by the whole application, so every
+            # window follows the new theme.
+            for window in self.windows:
+                window.appThemeName = selectedThemeName
+                window.appTheme = selectedTheme
+                window._updateThemedIcons()
 
-            self._createMenuBar()
-            self.removeToolBar(self.toolBar)
-            self._createToolBar()
-            self.activeImageChanged.emit()
+            self.settings.set("theme", "xml", selectedTheme)
+            self.settings.set("theme", "name", selectedThemeName)
 
             settingsDialog.close()
 
@@ -844,7 +1289,7 @@ To The Recycle Bin!",
         settingsDialogThemeSetting = QComboBox(settingsDialog)
         settingsDialogThemeSetting.addItems([
             theme.replace('.xml', '').replace('_', ' ').title()
-            for theme in list_themes()
+            for theme in self.stylesheets.themes()
         ])
         settingsDialogThemeSetting.setCurrentText(self.appThemeName)
 
@@ -865,6 +1310,12 @@ To The Recycle Bin!",
         settingsDialog.resize(400, 100)
         settingsDialog.exec()
 
+    @pyqtSlot(object)
+    def onSettingsWriteFailed(self, e: Exception) -> None:
+        self.statusBar.showMessage(
+            f"Unable To Save The Settings File! ({e})", 5000
+        )
+
     @pyqtSlot()
     def onBackActionTriggered(self) -> None:
         backConfirmation = QMessageBox(
@@ -882,43 +1333,58 @@ To The Recycle Bin!",
             self.activeImage = None
             self.activeImagePath = None
 
+    @pyqtSlot()
+    def onUndoActionTriggered(self) -> None:
+        if not self.history.canUndo():
+            return
+
+        self.transformEngine.cancel()
+        self.pendingImage = None
+
+        document, message = self.history.undo(self.activeImage)
+        self.activeImage = document
+        self.statusBar.showMessage(f"Undo: {message}", 2000)
+
+    @pyqtSlot()
+    def onRedoActionTriggered(self) -> None:
+        if not self.history.canRedo():
+            return
+
+        self.transformEngine.cancel()
+        self.pendingImage = None
+
+        document, message = self.history.redo(self.activeImage)
+        self.activeImage = document
+        self.statusBar.showMessage(f"Redo: {message}", 2000)
+
     @pyqtSlot()
     def onCopyActionTriggered(self) -> None:
-        self.app.clipboard().setPixmap(QPixmap.fromImage(
-            ImageQt.ImageQt(self.activeImage.convert("RGBA"))
-        ))
+        # Edits are only recorded on the document, so the full resolution
+        # pixels are rendered on a worker the first time they are copied.
+        if (
+            self.displayBuffer is not None
+            and self.displayBuffer.version == self._activeImageVersion
+        ):
+            return self.onCopyFinished(self.displayBuffer, None)
+
+        self.statusBar.showMessage("Copying Image...")
+        self.copyEngine.submit(
+            None, self.activeImage, DisplayBuffer.rendered,
+            self._activeImageVersion
+        )
+
+    @pyqtSlot(object, object)
+    def onCopyFinished(self, displayBuffer: DisplayBuffer, _) -> None:
+        if displayBuffer.version != self._activeImageVersion:
+            return
+        self.displayBuffer = displayBuffer
+        self.app.clipboard().setImage(displayBuffer.qimage())
         self.statusBar.showMessage("Image Copied To Clipboard", 2000)
 
     @pyqtSlot()
     def onSaveActionTriggered(self) -> None:
         if self.activeImagePath is not None:
-            try:
-                with open(self.activeImagePath, "wb") as imageFile:
-                    self.activeImage.save(imageFile, self.activeImage.format)
-            except UnidentifiedImageError as e:
-                errorMessage = QMessageBox(
-                    QMessageBox.Warning,
-                    self.appTitle,
-                    "Unidentified Image Type Found! Please Try Another \
-Extension.",
-                    QMessageBox.Ok
-                )
-                errorMessage.setInformativeText(str(e))
-                errorMessage.setWindowIcon(QIcon(self.appIconPath))
-                return errorMessage.exec()
-
-            except OSError as e:
-                errorMessage = QMessageBox(
-                    QMessageBox.Warning,
-                    self.appTitle,
-                    "Unable To Save Your Image!",
-                    QMessageBox.Ok
-                )
-                errorMessage.setInformativeText(str(e))
-                errorMessage.setWindowIcon(QIcon(self.appIconPath))
-                return errorMessage.exec()
-
-            self.statusBar.showMessage("Image Saved", 2000)
+            self._startSave(self.activeImagePath, self.activeImage.format)
         else:
             self.onSaveAsActionTriggered()
 
@@ -939,46 +1405,419 @@ Extension.",
 (*.{self.activeImage.format.lower()});;{';;'.join(fileFormatList)};;\
 All Files (*)"
         )
-        if (f := saveFilePath[0]) is not None:
+        if f := saveFilePath[0]:
+            self._startSave(f, saveAs=True)
+
+    def _startSave(
+        self, path: str, imageFormat: str = None, saveAs: bool = False
+    ) -> SaveJob:
+        def __saveFinished(savedPath: str) -> None:
+            __saveDone()
+            if saveAs:
+                if version == self._activeImageVersion:
+                    self.activeImagePath = savedPath
+                self.statusBar.showMessage(
+                    f"Image Saved As {savedPath}", 2000
+                )
+            else:
+                self.statusBar.showMessage("Image Saved", 2000)
+
+        def __saveFailed(e: Exception) -> None:
+            __saveDone()
+            errorMessage = QMessageBox(
+                QMessageBox.Warning,
+                self.appTitle,
+                "Unidentified Image Type Found! Please Try Another \
+Extension." if isinstance(e, (UnidentifiedImageError, ValueError, KeyError))
+                else "Unable To Save Your Image!",
+                QMessageBox.Ok
+            )
+            errorMessage.setInformativeText(str(e))
+            errorMessage.setWindowIcon(QIcon(self.appIconPath))
+            return errorMessage.exec()
+
+        def __saveCancelled() -> None:
+            __saveDone()
+            self.statusBar.showMessage(f"Saving {path} Cancelled", 2000)
+
+        def __saveDone() -> None:
+            self.saveJobs.remove(saveJob)
+            self.onSaveJobsChanged()
+
+        version = self._activeImageVersion
+
+        saveJob = SaveJob(self.activeImage, path, imageFormat)
+        saveJob.signals.progress.connect(self.onSaveJobsChanged)
+        saveJob.signals.finished.connect(__saveFinished)
+        saveJob.signals.failed.connect(__saveFailed)
+        saveJob.signals.cancelled.connect(__saveCancelled)
+
+        self.saveJobs.append(saveJob)
+        self.onSaveJobsChanged()
+
+        QThreadPool.globalInstance().start(saveJob)
+
+        return saveJob
+
+    @pyqtSlot()
+    def onSaveJobsChanged(self) -> None:
+        if self.saveJobs:
+            bytesWritten = sum(job.bytesWritten for job in self.saveJobs)
+            self.saveProgress.setText(
+                f"Saving {len(self.saveJobs)} \
+Image{'s' if len(self.saveJobs) > 1 else ''} \
+({bytesWritten / 1048576:.1f} MB Written)"
+            )
+            self.saveProgress.show()
+            self.saveCancel.show()
+        else:
+            self.saveProgress.hide()
+            self.saveCancel.hide()
+
+    @pyqtSlot()
+    def onSaveCancelClicked(self) -> None:
+        for job in self.saveJobs:
+            job.cancel()
+
+    @pyqtSlot()
+    def onExportActionTriggered(self) -> None:
+        from batch import parseSize, targetSize
+
+        def __formatOf(label: str) -> tuple:
+            extension = label.rsplit("*", 1)[-1].rstrip(")")
+            return Image.registered_extensions().get(extension), extension
+
+        def __loadTarget(target) -> dict:
+            # The settings file can be edited by hand, so a stored target
+            # that would not export is dropped instead of failing later.
+            if type(target) is not dict:
+                return None
+            size = target.get("size", "")
+            quality = target.get("quality", 90)
+            if (
+                target.get("format") not in self.supportedFormats
+                or type(size) is not str
+                or type(quality) is not int or not 1 <= quality <= 100
+            ):
+                return None
             try:
-                with open(f, "wb")as imageFile:
-                    self.activeImage.save(imageFile)
-            except UnidentifiedImageError as e:
+                if size.strip():
+                    parseSize(size.strip())
+            except ValueError:
+                return None
+            return {
+                "format": target["format"],
+                "size": size.strip(),
+                "quality": quality
+            }
+
+        def __targetText(target: dict, status: str = None) -> str:
+            text = f"{target['format']} - {target['size'] or 'Original Size'}"
+            if __formatOf(target["format"])[0] == "JPEG":
+                text += f" - Quality {target['quality']}"
+            return f"{text} - {status}" if status else text
+
+        def __formatChanged(label: str) -> None:
+            exportDialogQuality.setEnabled(__formatOf(label)[0] == "JPEG")
+
+        def __browse() -> None:
+            if directory := QFileDialog.getExistingDirectory(
+                exportDialog, "Select Output Folder",
+                exportDialogTargetField.text()
+            ):
+                exportDialogTargetField.setText(directory)
+
+        def __addTarget() -> None:
+            sizeText = exportDialogSizeField.text().strip()
+            try:
+                if sizeText:
+                    parseSize(sizeText)
+            except ValueError as e:
                 errorMessage = QMessageBox(
                     QMessageBox.Warning,
                     self.appTitle,
-                    "Unidentified Image Type Found! Please Try Another \
-Extension.",
+                    "Invalid Value Entered! Please Enter A Valid Value.",
                     QMessageBox.Ok
                 )
                 errorMessage.setInformativeText(str(e))
                 errorMessage.setWindowIcon(QIcon(self.appIconPath))
                 return errorMessage.exec()
 
-            except OSError as e:
+            target = {
+                "format": exportDialogFormat.currentText(),
+                "size": sizeText,
+                "quality": exportDialogQuality.value()
+            }
+            targets.append(target)
+            exportDialogTargets.addItem(__targetText(target))
+            exportDialogSizeField.clear()
+            self.settings.set("export", "targets", list(targets))
+
+        def __removeTarget() -> None:
+            if (row := exportDialogTargets.currentRow()) >= 0:
+                del targets[row]
+                exportDialogTargets.takeItem(row)
+                self.settings.set("export", "targets", list(targets))
+
+        def __startExport() -> None:
+            if not targets:
+                return
+            if not os.path.isdir(directory := exportDialogTargetField.text()):
                 errorMessage = QMessageBox(
                     QMessageBox.Warning,
                     self.appTitle,
-                    "Unable To Save Your Image!",
+                    "Please Select An Output Folder!",
                     QMessageBox.Ok
                 )
-                errorMessage.setInformativeText(str(e))
                 errorMessage.setWindowIcon(QIcon(self.appIconPath))
                 return errorMessage.exec()
 
-            self.activeImagePath = f
-            self.statusBar.showMessage(
-                f"Image Saved As {self.activeImagePath}", 2000
+            exportStart.setEnabled(False)
+            exportDialogSummary.setText(f"Exporting {len(targets)} Files...")
+            results.clear()
+            started.clear()
+            started.append(time.perf_counter())
+
+            # The edits are rendered once, on a worker, into the source all
+            # the targets share.
+            exportEngine.submit(
+                (directory, list(targets),), self.activeImage,
+                ImageDocument.flattened
+            )
+
+        def __exportSourceReady(source: ImageDocument, tag: tuple) -> None:
+            directory, exportTargets = tag
+            name = exportDialogNameField.text().strip() or "Image"
+            paths = set()
+
+            # Every target is a document of its own over the same source, so
+            # the pixels are decoded once and each encode runs on a thread of
+            # the pool, where Pillow releases the GIL. Targets the original
+            # bytes can be copied to keep using the document they came from.
+            for row, target in enumerate(exportTargets):
+                imageFormat, extension = __formatOf(target["format"])
+
+                stem = name + (f"-{target['size']}" if target["size"] else "")
+                path, number = os.path.join(directory, stem + extension), 2
+                while path in paths:
+                    path = os.path.join(
+                        directory, f"{stem}-{number}{extension}"
+                    )
+                    number += 1
+                paths.add(path)
+
+                params = (
+                    {"quality": target["quality"]}
+                    if imageFormat == "JPEG" else {}
+                )
+                document = source
+                if target["size"]:
+                    document = document.withOperation(Resize(targetSize(
+                        document.size, parseSize(target["size"])
+                    )))
+                elif (
+                    not params
+                    and self.activeImage.encodedAs(imageFormat) is not None
+                ):
+                    document = self.activeImage
+
+                __startTarget(row, document, path, imageFormat, params)
+
+        def __startTarget(
+            row: int, document: ImageDocument, path: str, imageFormat: str,
+            params: dict
+        ) -> None:
+            def __targetStatus(status: str) -> None:
+                if (
+                    row < len(targets)
+                    and (item := exportDialogTargets.item(row)) is not None
+                ):
+                    item.setText(__targetText(targets[row], status))
+
+            def __targetDone(status: str, succeeded: bool) -> None:
+                self.saveJobs.remove(saveJob)
+                self.onSaveJobsChanged()
+                __targetStatus(status)
+
+                results.append(succeeded)
+                if len(results) == len(exportJobs):
+                    exportJobs.clear()
+                    exportStart.setEnabled(True)
+                    exportDialogSummary.setText(
+                        f"Exported {sum(results)} Of {len(results)} Files In \
+{time.perf_counter() - started[0]:.1f}s"
+                    )
+
+            saveJob = SaveJob(document, path, imageFormat, **params)
+            saveJob.signals.progress.connect(
+                lambda written: __targetStatus(
+                    f"{written / 1048576:.1f} MB Written"
+                )
+            )
+            saveJob.signals.progress.connect(self.onSaveJobsChanged)
+            saveJob.signals.finished.connect(
+                lambda savedPath: __targetDone(
+                    f"Saved As {os.path.basename(savedPath)}", True
+                )
+            )
+            saveJob.signals.failed.connect(
+                lambda e: __targetDone(f"Failed: {e}", False)
             )
+            saveJob.signals.cancelled.connect(
+                lambda: __targetDone("Cancelled", False)
+            )
+
+            exportJobs.append(saveJob)
+            self.saveJobs.append(saveJob)
+            self.onSaveJobsChanged()
+            __targetStatus("Waiting")
+
+            QThreadPool.globalInstance().start(saveJob)
+
+        def __exportSourceFailed(e: Exception, _) -> None:
+            exportStart.setEnabled(True)
+            exportDialogSummary.setText(f"Export Failed: {e}")
+
+        targets = [
+            target
+            for target in map(__loadTarget, self.settings.get(
+                "export", "targets"
+            ))
+            if target is not None
+        ]
+        exportJobs = []
+        results = []
+        started = []
+
+        exportDialog = QDialog(self)
+
+        # Not cancelled when the dialog closes, an export that was started
+        # still ends up on disk.
+        exportEngine = TransformEngine(exportDialog)
+        exportEngine.finished.connect(__exportSourceReady)
+        exportEngine.failed.connect(__exportSourceFailed)
+
+        exportDialogLayout = QVBoxLayout(exportDialog)
+
+        exportDialogTarget = QWidget(exportDialog)
+        exportDialogTargetLayout = QHBoxLayout(exportDialogTarget)
+        exportDialogTargetField = QLineEdit(
+            os.path.dirname(self.activeImagePath)
+            if self.activeImagePath is not None
+            else QStandardPaths.standardLocations(
+                QStandardPaths.PicturesLocation
+            )[-1],
+            exportDialogTarget
+        )
+        exportDialogTargetBrowse = QPushButton("Browse", exportDialogTarget)
+        exportDialogTargetBrowse.clicked.connect(__browse)
+        exportDialogTargetLayout.addWidget(
+            QLabel("Output:", exportDialogTarget)
+        )
+        exportDialogTargetLayout.addSpacing(10)
+        exportDialogTargetLayout.addWidget(exportDialogTargetField)
+        exportDialogTargetLayout.addWidget(exportDialogTargetBrowse)
+        exportDialogTarget.setLayout(exportDialogTargetLayout)
+
+        exportDialogNameField = QLineEdit(
+            os.path.splitext(os.path.basename(self.activeImagePath))[0]
+            if self.activeImagePath is not None else "Image",
+            exportDialog
+        )
+        exportDialogNameField.setPlaceholderText("File Name")
+
+        exportDialogEditor = QWidget(exportDialog)
+        exportDialogEditorLayout = QHBoxLayout(exportDialogEditor)
+        exportDialogFormat = QComboBox(exportDialogEditor)
+        exportDialogFormat.addItems(self.supportedFormats)
+        exportDialogSizeField = QLineEdit(exportDialogEditor)
+        exportDialogSizeField.setPlaceholderText("Size (Empty To Keep)")
+        exportDialogQuality = QSlider(Qt.Horizontal, exportDialogEditor)
+        exportDialogQuality.setRange(1, 100)
+        exportDialogQuality.setValue(90)
+        exportDialogQualityLabel = QLabel("90", exportDialogEditor)
+        exportDialogQuality.valueChanged.connect(
+            lambda val: exportDialogQualityLabel.setText(str(val))
+        )
+        exportDialogFormat.currentTextChanged.connect(__formatChanged)
+        exportDialogFormat.setCurrentText("PNG Image (*.png)")
+        __formatChanged(exportDialogFormat.currentText())
+        exportDialogAdd = QPushButton("Add", exportDialogEditor)
+        exportDialogAdd.clicked.connect(__addTarget)
+        exportDialogEditorLayout.addWidget(exportDialogFormat)
+        exportDialogEditorLayout.addWidget(exportDialogSizeField)
+        exportDialogEditorLayout.addWidget(exportDialogQuality)
+        exportDialogEditorLayout.addWidget(exportDialogQualityLabel)
+        exportDialogEditorLayout.addWidget(exportDialogAdd)
+        exportDialogEditor.setLayout(exportDialogEditorLayout)
+
+        exportDialogTargets = QListWidget(exportDialog)
+        for target in targets:
+            exportDialogTargets.addItem(__targetText(target))
+
+        exportDialogRemove = QPushButton("Remove Selected", exportDialog)
+        exportDialogRemove.clicked.connect(__removeTarget)
+
+        exportDialogSummary = QLabel(exportDialog)
+        exportDialogSummary.setAlignment(Qt.AlignCenter)
+
+        exportDialogButtons = QDialogButtonBox(
+            QDialogButtonBox.Ok | QDialogButtonBox.Close,
+            exportDialog
+        )
+        exportStart = exportDialogButtons.button(QDialogButtonBox.Ok)
+        exportStart.setText("Export")
+        exportDialogButtons.accepted.connect(__startExport)
+        exportDialogButtons.rejected.connect(exportDialog.close)
+
+        exportDialogLayout.addWidget(exportDialogTarget)
+        exportDialogLayout.addWidget(exportDialogNameField)
+        exportDialogLayout.addWidget(exportDialogEditor)
+        exportDialogLayout.addWidget(exportDialogTargets)
+        exportDialogLayout.addWidget(exportDialogRemove)
+        exportDialogLayout.addWidget(exportDialogSummary)
+        exportDialogLayout.addSpacing(25)
+        exportDialogLayout.addWidget(exportDialogButtons)
+
+        exportDialog.setWindowTitle(self.appTitle)
+        exportDialog.setWindowIcon(QIcon(self.appIconPath))
+        exportDialog.setLayout(exportDialogLayout)
+
+        exportDialog.resize(550, 450)
+        exportDialog.exec()
 
     @pyqtSlot()
     def onResizeActionTriggered(self) -> None:
+        def __targetSize() -> tuple:
+            newWidth = int(round(float(resizeDialogWidthField.text())))
+            newHeight = int(round(float(resizeDialogHeightField.text())))
+
+            maintainAspect = resizeDialogAspectRatio.isChecked()
+
+            if maintainAspect:
+                if resizeDialogRespectWidth.isChecked():
+                    widthPercent = (newWidth / self.activeImage.size[0])
+                    realHeight = int(float(newHeight) * float(widthPercent))
+                    newSize = (newWidth, realHeight,)
+                else:
+                    heightPercent = (newHeight / self.activeImage.size[1])
+                    realWidth = int(float(newWidth) * float(heightPercent))
+                    newSize = (realWidth, newHeight,)
+            else:
+                newSize = (newWidth, newHeight,)
+
+            if min(newSize) < 1:
+                raise ValueError(
+                    f"Invalid Dimensions: {newSize[0]} × {newSize[1]}"
+                )
+
+            return newSize
+
         def __resizeImage():
             oldDimensions = self.imageDimensions.text()
 
             try:
-                newWidth = int(round(float(resizeDialogWidthField.text())))
-                newHeight = int(round(float(resizeDialogHeightField.text())))
+                newSize = __targetSize()
             except ValueError as e:
                 errorMessage = QMessageBox(
                     QMessageBox.Warning,
@@ -990,48 +1829,58 @@ Extension.",
                 errorMessage.setWindowIcon(QIcon(self.appIconPath))
                 return errorMessage.exec()
 
-            maintainAspect = resizeDialogAspectRatio.isChecked()
+            self._applyOperation(
+                Resize(newSize),
+                f"Image Resized ({oldDimensions} To \
+{newSize[0]} × {newSize[1]})"
+            )
 
-            if maintainAspect:
-                if resizeDialogRespectWidth.isChecked():
-                    widthPercent = (newWidth / self.activeImage.size[0])
-                    realHeight = int(float(newHeight) * float(widthPercent))
-                    imgFormat = self.activeImage.format
-                    self.activeImage = self.activeImage.resize(
-                        (newWidth, realHeight,), Image.ANTIALIAS
-                    )
-                    self.activeImage.format = imgFormat
-                    self.imageFormat.setText(imgFormat)
-                else:
-                    heightPercent = (newHeight / self.activeImage.size[1])
-                    realWidth = int(float(newWidth) * float(heightPercent))
-                    imgFormat = self.activeImage.format
-                    self.activeImage = self.activeImage.resize(
-                        (realWidth, newHeight,), Image.ANTIALIAS
-                    )
-                    self.activeImage.format = imgFormat
-                    self.imageFormat.setText(imgFormat)
-            else:
-                imgFormat = self.activeImage.format
-                self.activeImage = self.activeImage.resize(
-                    (newWidth, newHeight,), Image.ANTIALIAS
-                )
-                self.activeImage.format = imgFormat
-                self.imageFormat.setText(imgFormat)
+            resizeDialog.close()
 
-            self.imageDimensions.setText(
-                f"{self.activeImage.size[0]} × {self.activeImage.size[1]}"
+        def __updatePreview() -> None:
+            try:
+                newSize = __targetSize()
+            except (ValueError, ZeroDivisionError):
+                resizeDialogPreviewSize.setText("Invalid Dimensions")
+                previewEngine.cancel()
+                return
+
+            resizeDialogPreviewSize.setText(f"{newSize[0]} × {newSize[1]}")
+            if proxyImage is None:
+                return
+
+            previewEngine.submit(
+                None,
+                proxyImage,
+                resizeImage,
+                fitSize(newSize, self.previewSize),
+                Image.ANTIALIAS
             )
 
-            resizeDialog.close()
-            self.statusBar.showMessage(
-                f"Image Resized ({oldDimensions} To \
-{self.imageDimensions.text()})",
-                2000
+        def __showPreview(preview: Image.Image, tag) -> None:
+            nonlocal proxyImage
+
+            if tag == "proxy":
+                proxyImage = preview
+                return __updatePreview()
+
+            previewBuffer = DisplayBuffer(preview)
+            resizeDialogPreview.setPixmap(
+                QPixmap.fromImage(previewBuffer.qimage())
             )
 
+        proxyImage = None
+
         resizeDialog = QDialog(self)
 
+        previewEngine = TransformEngine(resizeDialog)
+        previewEngine.finished.connect(__showPreview)
+
+        previewTimer = QTimer(resizeDialog)
+        previewTimer.setSingleShot(True)
+        previewTimer.setInterval(self.previewDelay)
+        previewTimer.timeout.connect(__updatePreview)
+
         resizeDialogLayout = QVBoxLayout(resizeDialog)
 
         resizeDialogWidth = QWidget(resizeDialog)
@@ -1091,6 +1940,20 @@ Extension.",
 
         resizeDialogRespect.setLayout(resizeDialogRespectLayout)
 
+        resizeDialogPreview = QLabel("Loading Preview...", resizeDialog)
+        resizeDialogPreview.setAlignment(Qt.AlignCenter)
+        resizeDialogPreview.setMinimumSize(
+            self.previewSize[0], self.previewSize[1]
+        )
+
+        resizeDialogPreviewSize = QLabel(resizeDialog)
+        resizeDialogPreviewSize.setAlignment(Qt.AlignCenter)
+
+        resizeDialogWidthField.textChanged.connect(previewTimer.start)
+        resizeDialogHeightField.textChanged.connect(previewTimer.start)
+        resizeDialogAspectRatio.stateChanged.connect(previewTimer.start)
+        resizeDialogRespectWidth.toggled.connect(previewTimer.start)
+
         resizeDialogButtons = QDialogButtonBox(
             QDialogButtonBox.Ok | QDialogButtonBox.Cancel, resizeDialog
         )
@@ -1108,6 +1971,9 @@ Extension.",
         resizeDialogLayout.addWidget(resizeDialogHeight)
         resizeDialogLayout.addWidget(resizeDialogAspectRatio)
         resizeDialogLayout.addWidget(resizeDialogRespect)
+        resizeDialogLayout.addSpacing(10)
+        resizeDialogLayout.addWidget(resizeDialogPreview)
+        resizeDialogLayout.addWidget(resizeDialogPreviewSize)
         resizeDialogLayout.addSpacing(25)
         resizeDialogLayout.addWidget(resizeDialogButtons)
 
@@ -1115,29 +1981,19 @@ Extension.",
         resizeDialog.setWindowIcon(QIcon(self.appIconPath))
         resizeDialog.setLayout(resizeDialogLayout)
 
-        resizeDialog.resize(400, 200)
+        self._submitProxy(previewEngine, self.previewSize)
+        __updatePreview()
+
+        resizeDialog.resize(400, 500)
         resizeDialog.exec()
 
+        previewEngine.cancel()
+
     @pyqtSlot()
     def onRotateActionTriggered(self) -> None:
         def __rotateImage():
             try:
-                angle = int(rotateDialogAngleField.text())
-                imgFormat = self.activeImage.format
-
-                if self.rotatedImgColor == "alpha":
-                    self.activeImage = self.activeImage.rotate(
-                        angle, fillcolor=(255, 255, 255, 0,),
-                        expand=True, resample=Image.BICUBIC
-                    )
-                else:
-                    self.activeImage = self.activeImage.rotate(
-                        angle, fillcolor=self.rotatedImgColor,
-                        expand=True, resample=Image.BICUBIC
-                    )
-
-                self.activeImage.format = imgFormat
-                self.imageFormat.setText(imgFormat)
+                angle = float(rotateDialogAngleField.text())
             except ValueError as e:
                 errorMessage = QMessageBox(
                     QMessageBox.Warning,
@@ -1149,13 +2005,67 @@ Extension.",
                 errorMessage.setWindowIcon(QIcon(self.appIconPath))
                 return errorMessage.exec()
 
+            self._applyOperation(
+                rotation(angle, __fillColor()),
+                f"Image Rotated {angle:g} Degrees"
+            )
+
             rotateDialog.close()
-            self.statusBar.showMessage(f"Image Rotated {angle} Degrees", 2000)
 
-        def __preview(color: str = "#ffffff") -> ImageQt.ImageQt:
+        def __fillColor():
+            return (
+                (255, 255, 255, 0,) if self.rotatedImgColor == "alpha"
+                else self.rotatedImgColor
+            )
+
+        def __renderPreview(
+            image: Image.Image, angle: float, fillcolor, progress=None
+        ) -> Image.Image:
+            preview = rotateImage(image, angle, fillcolor, Image.BICUBIC)
+            previewSize = fitSize(preview.size, self.previewSize)
+            if previewSize != preview.size:
+                preview = preview.resize(previewSize, Image.BILINEAR)
+            if preview.mode in ["LA", "RGBA"]:
+                preview = Image.alpha_composite(
+                    checkerboard(preview.size), preview.convert("RGBA")
+                )
+            return preview
+
+        def __updatePreview() -> None:
+            try:
+                angle = float(rotateDialogAngleField.text() or 0)
+            except ValueError:
+                previewEngine.cancel()
+                return
+
+            rotateDialogAngleSlider.blockSignals(True)
+            rotateDialogAngleSlider.setValue(
+                int(round((angle + 180) % 360 - 180))
+            )
+            rotateDialogAngleSlider.blockSignals(False)
+            if proxyImage is None:
+                return
+
+            previewEngine.submit(
+                None, proxyImage, __renderPreview, angle, __fillColor()
+            )
+
+        def __showPreview(preview: Image.Image, tag) -> None:
+            nonlocal proxyImage
+
+            if tag == "proxy":
+                proxyImage = preview
+                return __updatePreview()
+
+            previewBuffer = DisplayBuffer(preview)
+            rotateDialogPreview.setPixmap(
+                QPixmap.fromImage(previewBuffer.qimage())
+            )
+
+        def __preview(color: str = "#ffffff") -> QImage:
             preview = Image.new("RGBA", (60, 25,), color)
             preview = ImageOps.expand(preview, border=4, fill="black")
-            return ImageQt.ImageQt(preview)
+            return DisplayBuffer(preview).qimage()
 
         def __pickColor():
             self.rotatedImgColor = QColorDialog.getColor(
@@ -1168,15 +2078,27 @@ Extension.",
             rotateDialogColorPreview.setPixmap(QPixmap.fromImage(
                 __preview(self.rotatedImgColor))
             )
+            previewTimer.start()
 
         def __transparent():
             self.rotatedImgColor = "alpha"
             rotateDialogColorPreview.setVisible(False)
+            previewTimer.start()
 
         self.rotatedImgColor = "#ffffff"
 
+        proxyImage = None
+
         rotateDialog = QDialog(self)
 
+        previewEngine = TransformEngine(rotateDialog)
+        previewEngine.finished.connect(__showPreview)
+
+        previewTimer = QTimer(rotateDialog)
+        previewTimer.setSingleShot(True)
+        previewTimer.setInterval(self.previewDelay)
+        previewTimer.timeout.connect(__updatePreview)
+
         rotateDialogLayout = QVBoxLayout(rotateDialog)
 
         rotateDialogAngle = QWidget(rotateDialog)
@@ -1193,6 +2115,20 @@ Extension.",
 
         rotateDialogAngle.setLayout(rotateDialogAngleLayout)
 
+        rotateDialogAngleSlider = QSlider(Qt.Horizontal, rotateDialog)
+        rotateDialogAngleSlider.setRange(-180, 180)
+        rotateDialogAngleSlider.valueChanged.connect(
+            lambda val: rotateDialogAngleField.setText(str(val))
+        )
+
+        rotateDialogAngleField.textChanged.connect(previewTimer.start)
+
+        rotateDialogPreview = QLabel("Loading Preview...", rotateDialog)
+        rotateDialogPreview.setAlignment(Qt.AlignCenter)
+        rotateDialogPreview.setMinimumSize(
+            self.previewSize[0], self.previewSize[1]
+        )
+
         rotateDialogColor = QWidget(rotateDialog)
 
         rotateDialogColorLayout = QHBoxLayout(rotateDialogColor)
@@ -1233,7 +2169,10 @@ Extension.",
         )
 
         rotateDialogLayout.addWidget(rotateDialogAngle)
+        rotateDialogLayout.addWidget(rotateDialogAngleSlider)
         rotateDialogLayout.addWidget(rotateDialogColor)
+        rotateDialogLayout.addSpacing(10)
+        rotateDialogLayout.addWidget(rotateDialogPreview)
         rotateDialogLayout.addSpacing(25)
         rotateDialogLayout.addWidget(rotateDialogButtons)
 
@@ -1241,24 +2180,97 @@ Extension.",
         rotateDialog.setWindowIcon(QIcon(self.appIconPath))
         rotateDialog.setLayout(rotateDialogLayout)
 
-        rotateDialog.resize(400, 150)
+        self._submitProxy(previewEngine, self.previewSize)
+        __updatePreview()
+
+        rotateDialog.resize(400, 450)
         rotateDialog.exec()
 
+        previewEngine.cancel()
+
     @pyqtSlot()
     def onRotateRightActionTriggered(self) -> None:
-        imgFormat = self.activeImage.format
-        self.activeImage = self.activeImage.transpose(Image.ROTATE_270)
-        self.activeImage.format = imgFormat
-        self.imageFormat.setText(imgFormat)
-        self.statusBar.showMessage("Image Rotated To The Right", 2000)
+        self._applyOperation(
+            Transpose(Image.ROTATE_270), "Image Rotated To The Right"
+        )
 
     @pyqtSlot()
     def onRotateLeftActionTriggered(self) -> None:
-        imgFormat = self.activeImage.format
-        self.activeImage = self.activeImage.transpose(Image.ROTATE_90)
-        self.activeImage.format = imgFormat
-        self.imageFormat.setText(imgFormat)
-        self.statusBar.showMessage("Image Rotated To The Left", 2000)
+        self._applyOperation(
+            Transpose(Image.ROTATE_90), "Image Rotated To The Left"
+        )
+
+    def _submitProxy(self, engine: TransformEngine, maxSize: tuple) -> None:
+        # Previews are computed from the pyramid level closest to their
+        # size, which may still have to be decoded or reduced from the full
+        # image, so it is built on the dialog's engine as its first job.
+        scale = min(
+            maxSize[0] / self.activeImage.size[0],
+            maxSize[1] / self.activeImage.size[1],
+            1
+        )
+        engine.submit(
+            "proxy", self.activeImage, ImageDocument.renderLevel,
+            self.activeImage.depthFor(scale)
+        )
+
+    def _applyOperation(self, operation, message: str) -> None:
+        # Edits made while a render is still running build on the pending
+        # document, and the new render supersedes the old one, so a burst
+        # of edits ends in a single resample of the original pixels.
+        if operation is None:
+            return
+
+        document = (self.pendingImage or self.activeImage).withOperation(
+            operation
+        )
+        self.pendingImage = document
+        self.transformEngine.submit(
+            (self._activeImageVersion, message, document,),
+            document,
+            ImageDocument.renderLevel,
+            document.depthFor(self.imageCanvas.zoom() / 100)
+        )
+
+    @pyqtSlot(bool)
+    def onTransformBusyChanged(self, busy: bool) -> None:
+        self.imageCanvas.setBusy(busy)
+        self.transformProgress.setVisible(busy)
+
+    @pyqtSlot(object, object)
+    def onTransformFinished(self, _, tag: tuple) -> None:
+        version, message, document = tag
+        if version != self._activeImageVersion:
+            return
+
+        self.history.push(self.activeImage, document, message)
+        self.activeImage = document
+        self.statusBar.showMessage(message, 2000)
+
+    @pyqtSlot(object, int)
+    def onLevelRequested(self, document: ImageDocument, depth: int) -> None:
+        # Only the level for the latest zoom is worth finishing, the canvas
+        # scales whatever it already has in the meantime.
+        self.levelEngine.submit(
+            (document, depth,), document, ImageDocument.renderLevel, depth
+        )
+
+    @pyqtSlot(object, object)
+    def onLevelFinished(self, level: Image.Image, tag: tuple) -> None:
+        document, depth = tag
+        self.imageCanvas.setLevel(document, depth, level)
+
+    @pyqtSlot(object, object)
+    def onTransformFailed(self, e: Exception, _) -> None:
+        errorMessage = QMessageBox(
+            QMessageBox.Warning,
+            self.appTitle,
+            "Unable To Transform Your Image!",
+            QMessageBox.Ok
+        )
+        errorMessage.setInformativeText(str(e))
+        errorMessage.setWindowIcon(QIcon(self.appIconPath))
+        return errorMessage.exec()
 
     @pyqtSlot()
     def onAboutActionTriggered(self) -> None:
@@ -1322,88 +2334,15 @@ For More Developer Info, Use <code>Help > Developer Info</code>
 
     @pyqtSlot()
     def onLicenseActionTriggered(self) -> None:
-        licenseDialog = QDialog(self)
+        from infodialogs import showLicenseDialog
 
-        licenseDialogLayout = QVBoxLayout(licenseDialog)
-
-        licenseDialogText = QTextBrowser(licenseDialog)
-        licenseDialogText.setOpenExternalLinks(True)
-
-        with open("html/license.html", "r") as license:
-            licenseDialogText.setHtml(license.read())
-
-        licenseDialogButtons = QDialogButtonBox(
-            QDialogButtonBox.Ok, licenseDialog
-        )
-        licenseDialogButtons.accepted.connect(licenseDialog.close)
-
-        licenseDialogLayout.setAlignment(Qt.AlignCenter)
-        licenseDialogLayout.addWidget(licenseDialogText)
-        licenseDialogLayout.addSpacing(25)
-        licenseDialogLayout.addWidget(licenseDialogButtons)
-
-        licenseDialog.setWindowTitle(self.appTitle)
-        licenseDialog.setLayout(licenseDialogLayout)
-        licenseDialog.resize(
-            QSize((self.width() - 100), (self.height() - 200))
-        )
-        licenseDialog.exec()
+        showLicenseDialog(self)
 
     @pyqtSlot()
     def onDevInfoActionTriggered(self) -> None:
-        sysVersion = sys.version
-        sysVersionInfo = sys.version_info
-
-        pilVersion = pil_version
-
-        pyqtVersion = PYQT_VERSION_STR
-        qtVersion = QT_VERSION_STR
-        sipVersion = SIP_VERSION_STR
-
-        pyInstallerExe = "Yes" if getattr(sys, "frozen", False) else "No"
-
-        devInfoDialog = QDialog(self)
-
-        devInfoDialogLayout = QVBoxLayout(devInfoDialog)
-
-        devInfoDialogText = QTextBrowser(devInfoDialog)
-        devInfoDialogText.setWordWrapMode(QTextOption.NoWrap)
-        devInfoDialogText.setHtml(f"""
-<h3>Clipboard2Image</h3>
-<b>Current version:</b> <i><code>{self.appVersion}</code></i></i><br>
-<b>Current theme:</b> <i><code>{self.appTheme}</code></i></i><br>
-<b>Current theme (human readable):</b> <i><code>{self.appThemeName}</code>
-</i></i><br>
-<h3>Python</h3>
-<b><code><b>sys.version</code>:</b> <i><code>{sysVersion}</code></i></i><br>
-<b><code><b>sys.version_info</code>:</b>
-<i><code>{sysVersionInfo}</code></i></i><br>
-<h3>PIL</h3>
-<b><code>PIL (pillow)</code> version:</b> <i><code>{pilVersion}</code></i><br>
-<h3>PyQt</h3>
-<b><code><b>PyQt</code> version:</b> <i><code<>{pyqtVersion}</code></i><br>
-<b><code><b>Qt</code> version:</b> <i><code>{qtVersion}</code></i><br>
-<b><code><b>sip</code> version:</b> <i><code>{sipVersion}</code></i><br>
-<h3>PyInstaller</h3>
-<b><code>PyInstaller</code> bundle:</b> <i><code>{pyInstallerExe}</code></i>
-""")
-
-        devInfoDialogButtons = QDialogButtonBox(
-            QDialogButtonBox.Ok, devInfoDialog
-        )
-        devInfoDialogButtons.accepted.connect(devInfoDialog.close)
-
-        devInfoDialogLayout.setAlignment(Qt.AlignCenter)
-        devInfoDialogLayout.addWidget(devInfoDialogText)
-        devInfoDialogLayout.addSpacing(25)
-        devInfoDialogLayout.addWidget(devInfoDialogButtons)
+        from infodialogs import showDevInfoDialog
 
-        devInfoDialog.setWindowTitle(self.appTitle)
-        devInfoDialog.setLayout(devInfoDialogLayout)
-        devInfoDialog.resize(
-            QSize((self.width() - 100), (self.height() - 200))
-        )
-        devInfoDialog.exec()
+        showDevInfoDialog(self)
 
     @pyqtSlot()
     def onActiveImageChanged(self) -> None:
@@ -1412,6 +2351,9 @@ For More Developer Info, Use <code>Help > Developer Info</code>
             for action in self.imageMenu.actions():
                 action.setEnabled(True)
 
+            self.undoAction.setEnabled(self.history.canUndo())
+            self.redoAction.setEnabled(self.history.canRedo())
+
             self.pasteAction.setEnabled(False)
             self.openAction.setEnabled(False)
 
@@ -1429,14 +2371,7 @@ For More Developer Info, Use <code>Help > Developer Info</code>
             self.imageDimensions.show()
             self.imageFormat.show()
 
-            self.imageViewLabel.setPixmap(
-                QPixmap.fromImage(
-                    ImageQt.ImageQt(self.activeImage.convert("RGBA"))
-                )
-            )
-
-            self.imageViewScrollArea.setWidgetResizable(False)
-            self.imageViewScrollArea.setWidgetResizable(True)
+            self.imageCanvas.setDocument(self.activeImage)
 
             self.centralWidget.setCurrentIndex(1)
             self.statusBar.showMessage(
@@ -1456,6 +2391,7 @@ For More Developer Info, Use <code>Help > Developer Info</code>
             self.statusBar.removeWidget(self.imageZoom)
             self.statusBar.removeWidget(self.imageDimensions)
             self.statusBar.removeWidget(self.imageFormat)
+            self.imageCanvas.setDocument(None)
             self.centralWidget.setCurrentIndex(0)
 
     @pyqtSlot()
@@ -1473,17 +2409,14 @@ For More Developer Info, Use <code>Help > Developer Info</code>
     def imagePasted(self) -> None:
         try:
             if sys.platform in ["wi32", "darwin"]:
+                from PIL import ImageGrab
+
                 image = ImageGrab.grabclipboard()
             else:
-                buffer = QBuffer(self)
-                buffer.open(QBuffer.ReadWrite)
-
-                clipboard = self.app.clipboard().image()
-                clipboard.save(buffer, "PNG")
-
-                imgFile = BytesIO(buffer.data())
-
-                image = Image.open(imgFile)
+                clipboard = self.app.clipboard()
+                image = imageFromMimeData(
+                    clipboard.mimeData(), clipboard.ownsClipboard()
+                )
 
             if type(image) is list:
                 image = Image.open(image[0])
@@ -1511,13 +2444,34 @@ File!\" Buttton!",
             errorMessage.setWindowIcon(QIcon(self.appIconPath))
             return errorMessage.exec()
 
-    @pyqtProperty(Image.Image, notify=activeImageChanged)
-    def activeImage(self) -> Image.Image:
+    @property
+    def history(self):
+        # Nothing can be undone before an image is open, so the history and
+        # its module are only set up then.
+        if self._history is None:
+            from history import UndoHistory
+
+            self._history = UndoHistory(
+                self.historyMemoryBudget << 20, self.historyDiskBudget << 20
+            )
+        return self._history
+
+    @pyqtProperty(object, notify=activeImageChanged)
+    def activeImage(self) -> ImageDocument:
         return self._activeImage
 
     @activeImage.setter
-    def activeImage(self, image: Image.Image) -> None:
+    def activeImage(self, image) -> None:
+        self._cancelLoad()
+        self.transformEngine.cancel()
+        self.pendingImage = None
+        if not isinstance(image, ImageDocument):
+            self.history.clear()
+        if isinstance(image, Image.Image):
+            image = ImageDocument(image)
         self._activeImage = image
+        self._activeImageVersion += 1
+        self.displayBuffer = None
         self.activeImageChanged.emit()
 
     @pyqtProperty(str, notify=activeImagePathChanged)
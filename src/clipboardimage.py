@@ -0,0 +1,91 @@
+from PyQt5.QtCore import QMimeData
+
+from PyQt5.QtGui import QImage
+
+from PIL import Image, BmpImagePlugin
+
+from io import BytesIO
+
+rawImageFormat = "application/x-qt-image"
+bitmapFormats = [
+    "image/bmp",
+    "image/x-bmp",
+    "image/x-MS-bmp",
+    "image/x-win-bitmap"
+]
+dibFormats = [
+    "application/x-qt-windows-mime;value=\"DeviceIndependentBitmap\"",
+    "application/x-qt-windows-mime;value=\"Format17\""
+]
+encodedFormats = [
+    "image/png",
+    "image/jpeg",
+    "image/jpg",
+    "image/gif",
+    "image/webp",
+    "image/tiff"
+]
+
+
+def imageFromQImage(qimage: QImage) -> Image.Image:
+    if qimage.isNull():
+        return None
+
+    if qimage.hasAlphaChannel():
+        qimage = qimage.convertToFormat(QImage.Format_RGBA8888)
+        mode = "RGBA"
+    else:
+        qimage = qimage.convertToFormat(QImage.Format_RGB888)
+        mode = "RGB"
+
+    data = qimage.constBits().asstring(qimage.byteCount())
+
+    image = Image.frombuffer(
+        mode,
+        (qimage.width(), qimage.height(),),
+        data,
+        "raw",
+        mode,
+        qimage.bytesPerLine(),
+        1
+    )
+    image.format = "PNG"
+    return image
+
+
+def imageFromMimeData(mimeData: QMimeData, ownsClipboard: bool = False):
+    formats = mimeData.formats()
+
+    # An image copied from this process is still held as a QImage, so its
+    # bits can be taken as they are without any encoding step.
+    if ownsClipboard and mimeData.hasImage():
+        return imageFromQImage(mimeData.imageData())
+
+    for mimeType in bitmapFormats:
+        if mimeType in formats:
+            image = Image.open(BytesIO(bytes(mimeData.data(mimeType))))
+            image.format = "PNG"
+            return image
+
+    for mimeType in dibFormats:
+        if mimeType in formats:
+            image = BmpImagePlugin.DibImageFile(
+                BytesIO(bytes(mimeData.data(mimeType)))
+            )
+            image.format = "PNG"
+            return image
+
+    for mimeType in encodedFormats:
+        if mimeType in formats:
+            return Image.open(BytesIO(bytes(mimeData.data(mimeType))))
+
+    if rawImageFormat in formats or mimeData.hasImage():
+        return imageFromQImage(mimeData.imageData())
+
+    if mimeData.hasUrls():
+        paths = [
+            url.toLocalFile() for url in mimeData.urls() if url.isLocalFile()
+        ]
+        return paths if paths else None
+
+    return None
@@ -0,0 +1,199 @@
+from PIL import Image
+
+import copy
+import errno
+import io
+import os
+import struct
+
+exifHeader = b"Exif\x00\x00"
+orientationTag = 0x0112
+
+
+def copyFile(source, target, progress=None, chunkSize: int = 8 << 20) -> None:
+    # The kernel moves the bytes from file to file where it can, so they
+    # never pass through this process; whatever it refuses is copied by
+    # hand from where the last call stopped.
+    for kernelCopy in ["copy_file_range", "sendfile"]:
+        if not hasattr(os, kernelCopy):
+            continue
+        try:
+            while True:
+                if kernelCopy == "copy_file_range":
+                    count = os.copy_file_range(
+                        source.fileno(), target.fileno(), chunkSize
+                    )
+                else:
+                    count = os.sendfile(
+                        target.fileno(), source.fileno(), None, chunkSize
+                    )
+                if not count:
+                    return
+                if progress is not None:
+                    progress(count)
+        except io.UnsupportedOperation:
+            break
+        except OSError as e:
+            if e.errno not in [
+                errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.ENOTSOCK,
+                errno.EOPNOTSUPP, errno.EBADF
+            ]:
+                raise
+
+    while chunk := source.read(chunkSize):
+        target.write(chunk)
+        if progress is not None:
+            progress(len(chunk))
+
+
+def orientedExif(payload: bytes, orientation: int) -> bytes:
+    # An existing Orientation entry is patched where it is, so everything
+    # else in the segment (maker notes with absolute offsets, thumbnails)
+    # stays byte for byte the same.
+    if payload.startswith(exifHeader):
+        tiff = payload[len(exifHeader):]
+        try:
+            order = "<" if tiff[:2] == b"II" else ">"
+            ifd, = struct.unpack_from(f"{order}I", tiff, 4)
+            count, = struct.unpack_from(f"{order}H", tiff, ifd)
+            for index in range(count):
+                entry = ifd + 2 + index * 12
+                tag, kind = struct.unpack_from(f"{order}HH", tiff, entry)
+                if tag == orientationTag and kind == 3:
+                    patched = bytearray(payload)
+                    struct.pack_into(
+                        f"{order}H", patched, len(exifHeader) + entry + 8,
+                        orientation
+                    )
+                    return bytes(patched)
+        except struct.error:
+            pass
+
+    exif = Image.Exif()
+    if payload.startswith(exifHeader):
+        exif.load(payload)
+    exif[orientationTag] = orientation
+    return exif.tobytes()
+
+
+def orientedHead(source, orientation: int) -> bytes:
+    # Reads the JPEG's leading application segments and returns them with
+    # the EXIF Orientation set, leaving the source right after the last
+    # segment read, from where the rest is copied unchanged.
+    head = source.read(2)
+    if head != b"\xff\xd8":
+        raise ValueError("Not A JPEG File")
+
+    segments = []
+    while True:
+        marker = source.read(4)
+        if len(marker) < 4 or marker[0] != 0xFF:
+            raise ValueError("Unable To Read The JPEG Segments")
+
+        if not 0xE0 <= marker[1] <= 0xEF:
+            # No EXIF segment at all: a new one goes right after the JFIF
+            # header, which has to stay first.
+            source.seek(-4, io.SEEK_CUR)
+            segments.insert(
+                1 if segments and segments[0][1] == 0xE0 else 0,
+                _segment(orientedExif(b"", orientation))
+            )
+            return head + b"".join(segments)
+
+        length, = struct.unpack(">H", marker[2:])
+        payload = source.read(length - 2)
+        if marker[1] == 0xE1 and payload.startswith(exifHeader):
+            segments.append(_segment(orientedExif(payload, orientation)))
+            return head + b"".join(segments)
+        segments.append(marker + payload)
+
+
+def _segment(payload: bytes) -> bytes:
+    if len(payload) + 2 > 0xFFFF:
+        raise ValueError("EXIF Data Too Large")
+    return b"\xff\xe1" + struct.pack(">H", len(payload) + 2) + payload
+
+
+class EncodedSource:
+    # The bytes an image was decoded from: a file, with the state it was in
+    # when opened so that a later change on disk is noticed, or data held
+    # in memory for pasted images.
+    def __init__(
+        self, imageFormat: str, path: str = None, data: bytes = None,
+        fileOrientation: int = 1
+    ) -> None:
+        self.format = imageFormat
+        self.path = path
+        self.data = data
+        self.fileOrientation = fileOrientation
+
+        # Set for a JPEG saved with a new EXIF Orientation, None keeps the
+        # bytes exactly as they are.
+        self.orientation = None
+
+        self._stat = self._statKey(path) if path is not None else None
+
+    @classmethod
+    def fromImage(
+        cls, image: Image.Image, orientation: int = 1
+    ) -> "EncodedSource":
+        # The plugin's own format, since pasted bitmaps are relabelled as
+        # PNG while their bytes are still a BMP. The file is only there
+        # until the pixels are loaded, so this has to be asked first.
+        imageFormat = type(image).format
+        if imageFormat is None:
+            return None
+        if getattr(image, "filename", None):
+            return cls(imageFormat, image.filename, None, orientation)
+        if isinstance(getattr(image, "fp", None), io.BytesIO):
+            return cls(imageFormat, None, image.fp.getvalue(), orientation)
+        return None
+
+    @staticmethod
+    def _statKey(path: str) -> tuple:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size,)
+
+    def isCurrent(self) -> bool:
+        if self.data is not None:
+            return True
+        return (
+            self._stat is not None and self._statKey(self.path) == self._stat
+        )
+
+    def isFile(self, path: str) -> bool:
+        if self.orientation is not None or self.path is None:
+            return False
+        try:
+            return os.path.samefile(self.path, path)
+        except OSError:
+            return False
+
+    def rewritten(self, orientation: int) -> None:
+        # The file was saved over with only its Orientation changed, so it
+        # still holds these pixels and later saves keep copying it.
+        self._stat = self._statKey(self.path)
+        self.fileOrientation = orientation
+
+    def withOrientation(self, orientation: int) -> "EncodedSource":
+        encoded = copy.copy(self)
+        encoded.orientation = orientation
+        return encoded
+
+    def copyTo(self, target, progress=None) -> None:
+        # Unbuffered, so the file position is where the kernel copy starts.
+        source = (
+            io.BytesIO(self.data) if self.data is not None
+            else open(self.path, "rb", buffering=0)
+        )
+        with source:
+            if self.orientation is not None:
+                head = orientedHead(source, self.orientation)
+                target.write(head)
+                target.flush()
+                if progress is not None:
+                    progress(len(head))
+            copyFile(source, target, progress)
@@ -0,0 +1,317 @@
+from PIL import Image
+
+import concurrent.futures
+import ctypes
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import zlib
+
+from operations import ImageDocument, Transpose
+from outofcore import exceeds, imageBytes
+
+# Spill directories carry the id of the process that made them, so the ones
+# left behind by an instance that crashed can be told from live ones.
+spillPrefix = "Clipboard2Image-history-"
+
+
+def processAlive(pid: int) -> bool:
+    if sys.platform == "win32":
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(0x1000, False, pid)
+        if not handle:
+            # Denied access means the process exists, it is someone else's.
+            return kernel32.GetLastError() == 5
+
+        exitCode = ctypes.c_ulong()
+        kernel32.GetExitCodeProcess(handle, ctypes.byref(exitCode))
+        kernel32.CloseHandle(handle)
+        return exitCode.value == 259
+
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def sweepSpillDirectories() -> None:
+    directory = tempfile.gettempdir()
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return
+
+    for name in names:
+        pid = name[len(spillPrefix):].split("-", 1)[0]
+        if (
+            name.startswith(spillPrefix) and pid.isdigit()
+            and not processAlive(int(pid))
+        ):
+            shutil.rmtree(os.path.join(directory, name), ignore_errors=True)
+
+
+class Snapshot:
+    compressLevel = 1
+
+    def __init__(self, image: Image.Image) -> None:
+        self.mode = image.mode
+        self.size = image.size
+        self.palette = image.getpalette() if image.mode == "P" else None
+
+        # The rendered level is only referenced here; the history's worker
+        # compresses it later, and a quick undo gets it back as it is.
+        self._image = image
+        self._data = None
+        self._path = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            if self._image is not None:
+                return imageBytes(self.mode, self.size)
+            return len(self._data) if self._data is not None else 0
+
+    def isSpilled(self) -> bool:
+        return self._path is not None
+
+    def diskSize(self) -> int:
+        with self._lock:
+            if self._path is None:
+                return 0
+            try:
+                return os.path.getsize(self._path)
+            except OSError:
+                return 0
+
+    def compress(self) -> None:
+        with self._lock:
+            image = self._image
+        if image is None:
+            return
+
+        data = zlib.compress(image.tobytes(), self.compressLevel)
+        with self._lock:
+            # Restored or discarded in the meantime.
+            if self._image is image:
+                self._data = data
+                self._image = None
+
+    def spill(self, directory: str) -> None:
+        with self._lock:
+            if self._path is not None or self._data is None:
+                return
+
+            try:
+                descriptor, path = tempfile.mkstemp(
+                    ".snapshot", dir=directory
+                )
+                with os.fdopen(descriptor, "wb") as snapshotFile:
+                    snapshotFile.write(self._data)
+            except OSError:
+                return
+            self._path = path
+            self._data = None
+
+    def restore(self) -> Image.Image:
+        with self._lock:
+            if self._image is not None:
+                return self._image
+            if self._data is not None:
+                data = self._data
+            else:
+                with open(self._path, "rb") as snapshotFile:
+                    data = snapshotFile.read()
+
+        image = Image.frombytes(self.mode, self.size, zlib.decompress(data))
+        if self.palette is not None:
+            image.putpalette(self.palette)
+        return image
+
+    def discard(self) -> None:
+        with self._lock:
+            if self._path is not None:
+                try:
+                    os.remove(self._path)
+                except OSError:
+                    pass
+            self._image = None
+            self._data = None
+            self._path = None
+
+
+class HistoryEntry:
+    def __init__(
+        self, document: ImageDocument, message: str, neighbour: ImageDocument
+    ) -> None:
+        self.document = document
+        self.message = message
+        self.transposes = None
+        self.snapshots = {}
+
+        # One document is always the other plus some operations, which are
+        # replayed forwards or inverted backwards to get from the neighbour
+        # to this entry.
+        if len(document.operations) > len(neighbour.operations):
+            operations = document.operations[len(neighbour.operations):]
+        else:
+            operations = tuple(reversed(
+                neighbour.operations[len(document.operations):]
+            ))
+
+        # Quarter turns and flips are undone by transposing the neighbour's
+        # levels, which is exact; anything lossy keeps the rendered levels
+        # themselves as compressed snapshots. Levels too large for memory
+        # are rendered again instead, compressing them would read them all.
+        if all(isinstance(operation, Transpose) for operation in operations):
+            self.transposes = (
+                operations
+                if len(document.operations) > len(neighbour.operations)
+                else tuple(operation.inverse() for operation in operations)
+            )
+        else:
+            self.snapshots = {
+                depth: Snapshot(level)
+                for depth, level in document.cachedLevels().items()
+                if not exceeds(level.mode, level.size)
+            }
+
+        document.releaseLevels()
+
+    def restore(self, neighbour: ImageDocument) -> ImageDocument:
+        if self.transposes is not None:
+            for depth, level in neighbour.cachedLevels().items():
+                for operation in self.transposes:
+                    level = operation.apply(level)
+                self.document.setLevel(depth, level)
+        else:
+            for depth, snapshot in self.snapshots.items():
+                self.document.setLevel(depth, snapshot.restore())
+
+        self.discard()
+        return self.document
+
+    def discard(self) -> None:
+        for snapshot in self.snapshots.values():
+            snapshot.discard()
+        self.snapshots = {}
+
+
+class UndoHistory:
+    def __init__(
+        self, memoryBudget: int = 64 << 20, diskBudget: int = 512 << 20
+    ) -> None:
+        self.memoryBudget = memoryBudget
+        self.diskBudget = diskBudget
+
+        self._undo = []
+        self._redo = []
+        self._directory = None
+
+        # Compressing and spilling snapshots reads every pixel of them, so
+        # it happens one pass at a time on a thread of its own.
+        self._executor = None
+
+    def canUndo(self) -> bool:
+        return bool(self._undo)
+
+    def canRedo(self) -> bool:
+        return bool(self._redo)
+
+    def push(
+        self, previous: ImageDocument, document: ImageDocument, message: str
+    ) -> None:
+        self._discard(self._redo)
+        self._redo = []
+
+        self._undo.append(HistoryEntry(previous, message, document))
+        self._enforceBudget()
+
+    def undo(self, current: ImageDocument) -> tuple:
+        entry = self._undo.pop()
+        document = entry.restore(current)
+
+        self._redo.append(HistoryEntry(current, entry.message, document))
+        self._enforceBudget()
+
+        return document, entry.message
+
+    def redo(self, current: ImageDocument) -> tuple:
+        entry = self._redo.pop()
+        document = entry.restore(current)
+
+        self._undo.append(HistoryEntry(current, entry.message, document))
+        self._enforceBudget()
+
+        return document, entry.message
+
+    def clear(self) -> None:
+        self._discard(self._undo)
+        self._discard(self._redo)
+        self._undo = []
+        self._redo = []
+
+        if self._directory is not None:
+            shutil.rmtree(self._directory, ignore_errors=True)
+            self._directory = None
+
+    def _snapshots(self) -> list:
+        # Oldest first: the bottom of the undo stack, then the redo entries
+        # furthest away from the current state.
+        return [
+            snapshot
+            for entry in self._undo + self._redo[::-1]
+            for snapshot in entry.snapshots.values()
+        ]
+
+    def _enforceBudget(self) -> None:
+        snapshots = self._snapshots()
+
+        if (
+            self._directory is None
+            and sum(len(snapshot) for snapshot in snapshots)
+            > self.memoryBudget
+        ):
+            self._directory = tempfile.mkdtemp(
+                prefix=f"{spillPrefix}{os.getpid()}-"
+            )
+        if snapshots:
+            if self._executor is None:
+                self._executor = concurrent.futures.ThreadPoolExecutor(
+                    1, "history"
+                )
+            self._executor.submit(
+                self._compact, snapshots, self.memoryBudget, self._directory
+            )
+
+        # Spilling is behind by up to one pass, which is caught up with on
+        # the next change. Entries go oldest first, redo entries included.
+        onDisk = sum(snapshot.diskSize() for snapshot in snapshots)
+        while onDisk > self.diskBudget and (self._undo or self._redo):
+            entry = self._undo.pop(0) if self._undo else self._redo.pop(0)
+            onDisk -= sum(
+                snapshot.diskSize() for snapshot in entry.snapshots.values()
+            )
+            entry.discard()
+
+    @staticmethod
+    def _compact(snapshots: list, memoryBudget: int, directory: str) -> None:
+        for snapshot in snapshots:
+            snapshot.compress()
+
+        inMemory = sum(len(snapshot) for snapshot in snapshots)
+        for snapshot in snapshots:
+            if inMemory <= memoryBudget or directory is None:
+                break
+            if not snapshot.isSpilled():
+                inMemory -= len(snapshot)
+                snapshot.spill(directory)
+
+    @staticmethod
+    def _discard(entries: list) -> None:
+        for entry in entries:
+            entry.discard()
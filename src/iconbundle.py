@@ -0,0 +1,123 @@
+from PyQt5.QtGui import QIcon, QPixmap
+
+import json
+import os
+import struct
+
+
+class IconBundle:
+    # Every icon of a directory packed into a single file: a magic, the
+    # length of a JSON index, the index and then the PNG data back to back.
+    magic = b"C2I-ICONS-1\n"
+    header = struct.Struct(">I")
+
+    def __init__(self, directory: str, bundlePath: str) -> None:
+        self.directory = directory
+        self.bundlePath = bundlePath
+
+        self._data = None
+        self._entries = None
+        self._icons = {}
+
+    def icon(self, name: str) -> QIcon:
+        if name in self._icons:
+            return self._icons[name]
+
+        if self._entries is None:
+            self._load()
+
+        icon = None
+        if name in self._entries:
+            offset, length = self._entries[name]
+            pixmap = QPixmap()
+            if pixmap.loadFromData(
+                self._data[offset:offset + length], "PNG"
+            ):
+                icon = QIcon(pixmap)
+        if icon is None:
+            icon = QIcon(os.path.join(self.directory, name))
+
+        self._icons[name] = icon
+        return icon
+
+    def _key(self, names: list) -> str:
+        # The directory only changes with the application, so its listing
+        # and modification time are enough to notice a stale bundle
+        # without opening any of the icons.
+        try:
+            modified = os.stat(self.directory).st_mtime_ns
+        except OSError:
+            modified = 0
+        return f"{modified}:{','.join(names)}"
+
+    def _load(self) -> None:
+        try:
+            names = sorted(
+                name for name in os.listdir(self.directory)
+                if name.endswith(".png")
+            )
+        except OSError:
+            names = []
+        key = self._key(names)
+
+        if not self._read(key):
+            self._build(names, key)
+
+    def _read(self, key: str) -> bool:
+        try:
+            with open(self.bundlePath, "rb") as bundleFile:
+                data = bundleFile.read()
+        except OSError:
+            return False
+
+        try:
+            if not data.startswith(self.magic):
+                return False
+            start = len(self.magic) + self.header.size
+            indexLength, = self.header.unpack_from(data, len(self.magic))
+            index = json.loads(data[start:start + indexLength])
+            if index["key"] != key:
+                return False
+            entries = {
+                name: (start + indexLength + offset, length,)
+                for name, (offset, length) in index["entries"].items()
+            }
+        except (struct.error, ValueError, KeyError, TypeError):
+            return False
+
+        self._data = memoryview(data)
+        self._entries = entries
+        return True
+
+    def _build(self, names: list, key: str) -> None:
+        chunks = []
+        entries = {}
+        offset = 0
+        for name in names:
+            try:
+                with open(os.path.join(self.directory, name), "rb") as file:
+                    chunk = file.read()
+            except OSError:
+                continue
+            entries[name] = (offset, len(chunk),)
+            chunks.append(chunk)
+            offset += len(chunk)
+
+        data = b"".join(chunks)
+        self._data = memoryview(data)
+        self._entries = entries
+
+        index = json.dumps({"key": key, "entries": entries}).encode()
+
+        # The bundle only saves time, so failing to write it is not an error.
+        try:
+            os.makedirs(os.path.dirname(self.bundlePath), exist_ok=True)
+            temporaryPath = f"{self.bundlePath}.{os.getpid()}.tmp"
+            with open(temporaryPath, "wb") as bundleFile:
+                bundleFile.write(self.magic)
+                bundleFile.write(self.header.pack(len(index)))
+                bundleFile.write(index)
+                bundleFile.write(data)
+            os.replace(temporaryPath, self.bundlePath)
+        except OSError:
+            pass
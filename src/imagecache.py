@@ -0,0 +1,163 @@
+from PIL import Image
+
+from collections import OrderedDict
+
+import os
+import threading
+
+from outofcore import exceeds, load, openImage
+from transforms import convertImage, reduceImage
+
+
+def checkerboard(size: tuple, square: int = 8) -> Image.Image:
+    tile = Image.new("RGBA", (square * 2, square * 2,), "#ffffff")
+    tile.paste("#cccccc", (0, 0, square, square,))
+    tile.paste("#cccccc", (square, square, square * 2, square * 2,))
+
+    board = Image.new("RGBA", size)
+    for top in range(0, size[1], square * 2):
+        for left in range(0, size[0], square * 2):
+            board.paste(tile, (left, top,))
+    return board
+
+
+def levelDepth(size: tuple, scale: float, minSize: int = 32) -> int:
+    # The deepest level that still has at least as many pixels as the
+    # requested zoom, so downscaling never starts from more than twice the
+    # pixels that end up on screen.
+    depth = 0
+    while (
+        scale <= 0.5 ** (depth + 1)
+        and min(size) >> (depth + 1) >= minSize
+    ):
+        depth += 1
+    return depth
+
+
+class ZoomPyramid:
+    reducibleModes = ["L", "LA", "RGB", "RGBA", "I", "F"]
+
+    # JPEG decodes straight to 1/2, 1/4 or 1/8 of its size (DCT scaling)
+    # and JPEG 2000 to any of its resolution levels, so a zoomed out view
+    # of a file that has not been decoded yet never touches every pixel.
+    draftFormats = ["JPEG", "JPEG2000"]
+    maxDraftDepth = 3
+
+    def __init__(self, image: Image.Image, minSize: int = 32) -> None:
+        self.minSize = minSize
+        self._levels = {0: image}
+
+        # Documents derived from the same file share their pyramid, so
+        # workers of several windows can decode and reduce at once.
+        self._lock = threading.RLock()
+
+    def base(self) -> Image.Image:
+        return self._levels[0]
+
+    def load(self) -> Image.Image:
+        with self._lock:
+            return load(self._levels[0])
+
+    def cachedLevels(self) -> dict:
+        # Read without the lock, which a worker may hold for a long decode;
+        # copying the dict is atomic, and a base that is not decoded yet is
+        # left out.
+        levels = dict(self._levels)
+        if getattr(levels[0], "im", None) is None:
+            del levels[0]
+        return levels
+
+    def levelFor(self, scale: float) -> Image.Image:
+        return self.level(
+            levelDepth(self._levels[0].size, scale, self.minSize)
+        )
+
+    def level(self, depth: int) -> Image.Image:
+        with self._lock:
+            return self._level(depth)
+
+    def _level(self, depth: int) -> Image.Image:
+        if depth == 0:
+            return load(self._levels[0])
+        if depth in self._levels:
+            return self._levels[depth]
+
+        nearest = max(level for level in self._levels if level < depth)
+        if nearest == 0 and (draft := self._draft(depth)) is not None:
+            nearest = min(depth, self.maxDraftDepth)
+            self._levels[nearest] = draft
+
+        previous = self._levels[nearest]
+        if nearest == 0:
+            load(previous)
+        if exceeds(previous.mode, previous.size):
+            # Levels in between would be held in memory just to be halved
+            # again, so a scratch backed image is reduced in one go.
+            if previous.mode not in self.reducibleModes:
+                previous = convertImage(previous, "RGBA")
+            self._levels[depth] = reduceImage(previous, 1 << (depth - nearest))
+            return self._levels[depth]
+
+        for level in range(nearest + 1, depth + 1):
+            if previous.mode not in self.reducibleModes:
+                previous = convertImage(previous, "RGBA")
+            previous = reduceImage(previous, 2)
+            self._levels[level] = previous
+        return self._levels[depth]
+
+    def _draft(self, depth: int) -> Image.Image:
+        # Once the full image is decoded, halving it is cheaper than
+        # decoding the file a second time.
+        base = self._levels[0]
+        if (
+            base.format not in self.draftFormats
+            or getattr(base, "im", None) is not None
+            or not getattr(base, "filename", None)
+        ):
+            return None
+
+        factor = min(depth, self.maxDraftDepth)
+        try:
+            image = openImage(base.filename)
+            if image.format == "JPEG":
+                image.draft(
+                    image.mode,
+                    (
+                        max(1, image.size[0] >> factor),
+                        max(1, image.size[1] >> factor),
+                    )
+                )
+            elif image.format == "JPEG2000":
+                image.reduce = factor
+            else:
+                return None
+            image.load()
+        except (OSError, ValueError, SyntaxError):
+            return None
+        return image
+
+
+class DecodedImageCache:
+    # Shared by every window of the process, so opening a file that is
+    # already open elsewhere reuses its decoded pixels and pyramid.
+    def __init__(self, maxImages: int = 8) -> None:
+        self.maxImages = maxImages
+        self._images = OrderedDict()
+
+    @staticmethod
+    def _key(path: str) -> tuple:
+        stat = os.stat(path)
+        return (os.path.realpath(path), stat.st_mtime_ns, stat.st_size,)
+
+    def get(self, path: str):
+        key = self._key(path)
+        value = self._images.get(key)
+        if value is not None:
+            self._images.move_to_end(key)
+        return value
+
+    def put(self, path: str, value) -> None:
+        self._images[self._key(path)] = value
+        self._images.move_to_end(self._key(path))
+        while len(self._images) > self.maxImages:
+            self._images.popitem(last=False)
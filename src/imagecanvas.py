@@ -0,0 +1,306 @@
+from PyQt5.QtWidgets import QWidget
+
+from PyQt5.QtCore import QRectF, QSize, Qt, pyqtSignal
+
+from PyQt5.QtGui import QColor, QImage, QPainter, QPaintEvent, QPixmap
+
+from PIL import Image
+
+from collections import OrderedDict
+
+from operations import ImageDocument
+
+
+class DisplayBuffer:
+    # Pillow keeps RGB padded to four bytes per pixel, so each of these
+    # has the same layout in memory as its QImage format.
+    qimageFormats = {
+        "RGB": QImage.Format_RGBX8888,
+        "RGBA": QImage.Format_RGBA8888,
+        "L": QImage.Format_Grayscale8
+    }
+    rawModes = {"RGB": "RGBX", "RGBA": "RGBA", "L": "L"}
+
+    def __init__(self, image: Image.Image, version: int = 0) -> None:
+        self.version = version
+        self.source = image
+
+        self._image = None
+        self._qimage = None
+
+    @classmethod
+    def rendered(
+        cls, document: ImageDocument, version: int = 0, progress=None
+    ) -> "DisplayBuffer":
+        # Meant for a worker: the render and the QImage both go over every
+        # pixel, and a QImage (unlike a QPixmap) can be built off the GUI
+        # thread.
+        displayBuffer = cls(document.render(progress), version)
+        displayBuffer.qimage()
+        return displayBuffer
+
+    @property
+    def size(self) -> tuple:
+        return self.source.size
+
+    def image(self) -> Image.Image:
+        if self._image is None:
+            self._image = (
+                self.source if self.source.mode in self.qimageFormats
+                else self.source.convert("RGBA")
+            )
+        return self._image
+
+    def qimage(self) -> QImage:
+        # The QImage owns its pixels, so it is implicitly shared with the
+        # clipboard or a QPixmap as it is.
+        if self._qimage is None:
+            image = self.image()
+            qimage = QImage(
+                image.size[0], image.size[1], self.qimageFormats[image.mode]
+            )
+            bits = qimage.bits()
+            bits.setsize(qimage.sizeInBytes())
+
+            # Pasting into the QImage's memory mapped as a Pillow image, the
+            # way scratch files are, is the only copy. map_buffer is not a
+            # public API though, so a Pillow without it gets rows padded to
+            # the QImage's stride by the raw encoder, at one copy more.
+            try:
+                mapped = Image.new(image.mode, (1, 1,))._new(
+                    Image.core.map_buffer(
+                        bits, image.size, "raw", 0,
+                        (image.mode, qimage.bytesPerLine(), 1)
+                    )
+                )
+            except (AttributeError, TypeError, ValueError):
+                bits[:] = image.tobytes(
+                    "raw", self.rawModes[image.mode], qimage.bytesPerLine()
+                )
+            else:
+                mapped.paste(image)
+            self._qimage = qimage
+        return self._qimage
+
+
+class TileCache:
+    def __init__(self, maxTiles: int = 128) -> None:
+        self.maxTiles = maxTiles
+        self._tiles = OrderedDict()
+
+    def get(self, key: tuple) -> QPixmap:
+        tile = self._tiles.get(key)
+        if tile is not None:
+            self._tiles.move_to_end(key)
+        return tile
+
+    def put(self, key: tuple, tile: QPixmap) -> None:
+        self._tiles[key] = tile
+        self._tiles.move_to_end(key)
+        while len(self._tiles) > self.maxTiles:
+            self._tiles.popitem(last=False)
+
+    def clear(self) -> None:
+        self._tiles.clear()
+
+
+class ImageCanvas(QWidget):
+    # Levels are never rendered while painting: a missing one is asked for
+    # with its depth, and handed back through setLevel once it is ready.
+    levelRequested = pyqtSignal(object, int)
+
+    tileSize = 256
+
+    def __init__(self, parent: QWidget = None) -> None:
+        super().__init__(parent)
+
+        self._document = None
+        self._preview = None
+        self._previewSize = None
+        self._placeholder = None
+        self._requestedDepth = None
+        self._zoom = 100
+        self._busy = False
+
+        self.tileCache = TileCache()
+
+    def document(self) -> ImageDocument:
+        return self._document
+
+    def setDocument(self, document: ImageDocument) -> None:
+        # The preview of a load stays under the tiles until the first
+        # level of the loaded image is ready.
+        self._placeholder = self._preview
+        self._requestedDepth = None
+        self._document = document
+        self._preview = None
+        self._previewSize = None
+        self.tileCache.clear()
+        self._updateSize()
+        self.update()
+
+    def setPreview(self, image: Image.Image, size: tuple) -> None:
+        # A partly loaded image is stretched over the size the document
+        # will have, so the layout does not jump when it is replaced.
+        self._document = None
+        self._placeholder = None
+        self._preview = QPixmap.fromImage(DisplayBuffer(image).qimage())
+        self._previewSize = size
+        self.tileCache.clear()
+        self._updateSize()
+        self.update()
+
+    def setLevel(
+        self, document: ImageDocument, depth: int, level: Image.Image
+    ) -> None:
+        if document is not self._document:
+            return
+        document.setLevel(depth, level)
+        if depth == self._requestedDepth:
+            self._requestedDepth = None
+        self.tileCache.clear()
+        self.update()
+
+    def zoom(self) -> int:
+        return self._zoom
+
+    def setZoom(self, percentage: int) -> None:
+        if percentage == self._zoom:
+            return
+        self._zoom = percentage
+        self._updateSize()
+        self.update()
+
+    def isBusy(self) -> bool:
+        return self._busy
+
+    def setBusy(self, busy: bool) -> None:
+        self._busy = busy
+        if busy:
+            self.setCursor(Qt.BusyCursor)
+        else:
+            self.unsetCursor()
+        self.update()
+
+    def sizeHint(self) -> QSize:
+        if self._document is not None:
+            size = self._document.size
+        elif self._previewSize is not None:
+            size = self._previewSize
+        else:
+            return QSize(0, 0)
+        return QSize(
+            max(1, round(size[0] * self._zoom / 100)),
+            max(1, round(size[1] * self._zoom / 100))
+        )
+
+    def _updateSize(self) -> None:
+        self.resize(self.sizeHint())
+        self.updateGeometry()
+
+    def paintEvent(self, event: QPaintEvent) -> None:
+        if self._preview is not None:
+            painter = QPainter(self)
+            painter.setRenderHint(QPainter.SmoothPixmapTransform)
+            painter.drawPixmap(self.rect(), self._preview)
+            painter.end()
+            return
+
+        if self._document is None:
+            return
+
+        exposed = event.rect().intersected(self.rect())
+
+        firstColumn = exposed.left() // self.tileSize
+        lastColumn = exposed.right() // self.tileSize
+        firstRow = exposed.top() // self.tileSize
+        lastRow = exposed.bottom() // self.tileSize
+
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.SmoothPixmapTransform)
+        for row in range(firstRow, lastRow + 1):
+            for column in range(firstColumn, lastColumn + 1):
+                tile = self._tile(column, row)
+                if tile is not None:
+                    painter.drawPixmap(
+                        column * self.tileSize, row * self.tileSize, tile
+                    )
+                elif self._placeholder is not None:
+                    self._drawPlaceholder(painter, column, row)
+        if self._busy:
+            painter.fillRect(exposed, QColor(255, 255, 255, 128))
+        painter.end()
+
+    def _tileRect(self, column: int, row: int) -> tuple:
+        left = column * self.tileSize
+        top = row * self.tileSize
+        right = min(left + self.tileSize, self.width())
+        bottom = min(top + self.tileSize, self.height())
+        return (left, top, right, bottom,)
+
+    def _drawPlaceholder(
+        self, painter: QPainter, column: int, row: int
+    ) -> None:
+        left, top, right, bottom = self._tileRect(column, row)
+        scaleX = self._placeholder.width() / max(1, self.width())
+        scaleY = self._placeholder.height() / max(1, self.height())
+        painter.drawPixmap(
+            QRectF(left, top, right - left, bottom - top),
+            self._placeholder,
+            QRectF(
+                left * scaleX, top * scaleY,
+                (right - left) * scaleX, (bottom - top) * scaleY
+            )
+        )
+
+    def _tile(self, column: int, row: int) -> QPixmap:
+        key = (self._zoom, column, row)
+        tile = self.tileCache.get(key)
+        if tile is not None:
+            return tile
+
+        depth = self._document.depthFor(self._zoom / 100)
+        cached = self._document.nearestLevel(depth)
+        if cached is None or cached[0] != depth:
+            if depth != self._requestedDepth:
+                self._requestedDepth = depth
+                self.levelRequested.emit(self._document, depth)
+            if cached is None:
+                return None
+
+        # Tiles of a stand-in level are drawn again once the real one is in.
+        tile = self._renderTile(column, row, cached[1], cached[0] != depth)
+        if cached[0] == depth:
+            self.tileCache.put(key, tile)
+        return tile
+
+    def _renderTile(
+        self, column: int, row: int, source: Image.Image,
+        standIn: bool = False
+    ) -> QPixmap:
+        scale = self._zoom / 100
+
+        left, top, right, bottom = self._tileRect(column, row)
+
+        scaleX = scale * self._document.size[0] / source.size[0]
+        scaleY = scale * self._document.size[1] / source.size[1]
+
+        # Only the source region under this tile is resampled and converted,
+        # so the cost of a tile does not depend on the size of the image.
+        if standIn:
+            resample = Image.BILINEAR
+        else:
+            resample = Image.NEAREST if scale >= 1 else Image.BOX
+        tileImage = source.resize(
+            (right - left, bottom - top,),
+            resample,
+            box=(
+                left / scaleX,
+                top / scaleY,
+                min(right / scaleX, source.size[0]),
+                min(bottom / scaleY, source.size[1]),
+            )
+        )
+
+        tileBuffer = DisplayBuffer(tileImage)
+        return QPixmap.fromImage(tileBuffer.qimage())
@@ -0,0 +1,102 @@
+from PyQt5.QtWidgets import (
+    QMainWindow,
+    QVBoxLayout,
+    QDialog,
+    QDialogButtonBox,
+    QTextBrowser
+)
+
+from PyQt5.QtCore import QSize, Qt, PYQT_VERSION_STR, QT_VERSION_STR
+
+from PyQt5.QtGui import QTextOption
+
+from PyQt5.sip import SIP_VERSION_STR
+
+from PIL import __version__ as pil_version
+
+import sys
+
+
+def showLicenseDialog(window: QMainWindow) -> None:
+    licenseDialog = QDialog(window)
+
+    licenseDialogLayout = QVBoxLayout(licenseDialog)
+
+    licenseDialogText = QTextBrowser(licenseDialog)
+    licenseDialogText.setOpenExternalLinks(True)
+
+    with open("html/license.html", "r") as license:
+        licenseDialogText.setHtml(license.read())
+
+    licenseDialogButtons = QDialogButtonBox(
+        QDialogButtonBox.Ok, licenseDialog
+    )
+    licenseDialogButtons.accepted.connect(licenseDialog.close)
+
+    licenseDialogLayout.setAlignment(Qt.AlignCenter)
+    licenseDialogLayout.addWidget(licenseDialogText)
+    licenseDialogLayout.addSpacing(25)
+    licenseDialogLayout.addWidget(licenseDialogButtons)
+
+    licenseDialog.setWindowTitle(window.appTitle)
+    licenseDialog.setLayout(licenseDialogLayout)
+    licenseDialog.resize(
+        QSize((window.width() - 100), (window.height() - 200))
+    )
+    licenseDialog.exec()
+
+
+def showDevInfoDialog(window: QMainWindow) -> None:
+    sysVersion = sys.version
+    sysVersionInfo = sys.version_info
+
+    pilVersion = pil_version
+
+    pyqtVersion = PYQT_VERSION_STR
+    qtVersion = QT_VERSION_STR
+    sipVersion = SIP_VERSION_STR
+
+    pyInstallerExe = "Yes" if getattr(sys, "frozen", False) else "No"
+
+    devInfoDialog = QDialog(window)
+
+    devInfoDialogLayout = QVBoxLayout(devInfoDialog)
+
+    devInfoDialogText = QTextBrowser(devInfoDialog)
+    devInfoDialogText.setWordWrapMode(QTextOption.NoWrap)
+    devInfoDialogText.setHtml(f"""
+<h3>Clipboard2Image</h3>
+<b>Current version:</b> <i><code>{window.appVersion}</code></i></i><br>
+<b>Current theme:</b> <i><code>{window.appTheme}</code></i></i><br>
+<b>Current theme (human readable):</b> <i><code>{window.appThemeName}</code>
+</i></i><br>
+<h3>Python</h3>
+<b><code><b>sys.version</code>:</b> <i><code>{sysVersion}</code></i></i><br>
+<b><code><b>sys.version_info</code>:</b>
+<i><code>{sysVersionInfo}</code></i></i><br>
+<h3>PIL</h3>
+<b><code>PIL (pillow)</code> version:</b> <i><code>{pilVersion}</code></i><br>
+<h3>PyQt</h3>
+<b><code><b>PyQt</code> version:</b> <i><code<>{pyqtVersion}</code></i><br>
+<b><code><b>Qt</code> version:</b> <i><code>{qtVersion}</code></i><br>
+<b><code><b>sip</code> version:</b> <i><code>{sipVersion}</code></i><br>
+<h3>PyInstaller</h3>
+<b><code>PyInstaller</code> bundle:</b> <i><code>{pyInstallerExe}</code></i>
+""")
+
+    devInfoDialogButtons = QDialogButtonBox(
+        QDialogButtonBox.Ok, devInfoDialog
+    )
+    devInfoDialogButtons.accepted.connect(devInfoDialog.close)
+
+    devInfoDialogLayout.setAlignment(Qt.AlignCenter)
+    devInfoDialogLayout.addWidget(devInfoDialogText)
+    devInfoDialogLayout.addSpacing(25)
+    devInfoDialogLayout.addWidget(devInfoDialogButtons)
+
+    devInfoDialog.setWindowTitle(window.appTitle)
+    devInfoDialog.setLayout(devInfoDialogLayout)
+    devInfoDialog.resize(
+        QSize((window.width() - 100), (window.height() - 200))
+    )
+    devInfoDialog.exec()
@@ -0,0 +1,90 @@
+from PyQt5.QtCore import QByteArray, QObject, pyqtSignal
+
+from PyQt5.QtNetwork import QLocalServer, QLocalSocket
+
+import getpass
+import json
+
+
+class InstanceServer(QObject):
+    argumentsReceived = pyqtSignal(list, str)
+
+    connectTimeout = 500
+
+    def __init__(self, name: str, parent: QObject = None) -> None:
+        super().__init__(parent)
+
+        self.serverName = f"{name}-{getpass.getuser()}"
+
+        # Only the user who started the instance may hand it files to open.
+        self._server = QLocalServer(self)
+        self._server.setSocketOptions(QLocalServer.UserAccessOption)
+        self._server.newConnection.connect(self._onNewConnection)
+        self._buffers = {}
+
+    def forward(self, args: list, callpath: str) -> bool:
+        # A launch that finds a running instance hands its arguments over
+        # and exits, instead of paying for a second interpreter and GUI.
+        # Called before any QCoreApplication exists, which is why only the
+        # blocking waitFor* calls are used: they need no event loop.
+        socket = QLocalSocket()
+        socket.connectToServer(self.serverName)
+        if not socket.waitForConnected(self.connectTimeout):
+            return False
+
+        socket.write(QByteArray(json.dumps({
+            "args": args,
+            "callpath": callpath
+        }).encode()))
+        socket.flush()
+        socket.waitForBytesWritten(self.connectTimeout)
+        socket.disconnectFromServer()
+        if socket.state() != QLocalSocket.UnconnectedState:
+            socket.waitForDisconnected(self.connectTimeout)
+        return True
+
+    def listen(self) -> bool:
+        if self._server.listen(self.serverName):
+            return True
+
+        # A crashed instance can leave its socket file behind on Unix, but
+        # one that still answers belongs to a live instance and is kept.
+        socket = QLocalSocket()
+        socket.connectToServer(self.serverName)
+        if socket.waitForConnected(self.connectTimeout):
+            socket.disconnectFromServer()
+            return False
+
+        QLocalServer.removeServer(self.serverName)
+        return self._server.listen(self.serverName)
+
+    def _onNewConnection(self) -> None:
+        while (socket := self._server.nextPendingConnection()) is not None:
+            self._buffers[socket] = b""
+            socket.readyRead.connect(lambda socket=socket: self._read(socket))
+            socket.disconnected.connect(
+                lambda socket=socket: self._finish(socket)
+            )
+            if socket.state() == QLocalSocket.UnconnectedState:
+                self._finish(socket)
+
+    def _read(self, socket: QLocalSocket) -> None:
+        if socket in self._buffers:
+            self._buffers[socket] += bytes(socket.readAll())
+
+    def _finish(self, socket: QLocalSocket) -> None:
+        if socket not in self._buffers:
+            return
+
+        self._read(socket)
+        data = self._buffers.pop(socket, b"")
+        socket.deleteLater()
+
+        try:
+            message = json.loads(data.decode())
+            args = [str(arg) for arg in message["args"]]
+            callpath = str(message["callpath"])
+        except (ValueError, KeyError, TypeError):
+            return
+
+        self.argumentsReceived.emit(args, callpath)
@@ -1,10 +1,8 @@
-from PyQt5.QtWidgets import QApplication
-from qt_material import apply_stylesheet
-
 import sys
 import os
+import threading
 
-from clipboard2image import Clipboard2Image
+from startup import isHeadless, trace
 
 callpath = os.getcwd()
 
@@ -14,20 +12,75 @@ os.chdir(os.path.dirname(
 
 
 def main() -> None:
+    if "--startup-trace" in sys.argv:
+        sys.argv.remove("--startup-trace")
+        trace.enable()
+
+    # Conversions from scripts never build the window, so Qt widgets, the
+    # theme and the stylesheet are only imported when the GUI is started.
+    if isHeadless(sys.argv[1:]):
+        import cli
+
+        status = cli.main(sys.argv[1:], callpath)
+        trace.mark("headless run finished")
+        trace.report()
+        return status
+
+    from instance import InstanceServer
+
+    # Later launches only forward their arguments to the running instance,
+    # which opens them in a new window of its own QApplication. A traced
+    # launch always starts its own instance, so there is something to time.
+    # No QCoreApplication exists yet; forward() only blocks on its socket.
+    server = InstanceServer("Clipboard2Image")
+    if not trace.enabled and server.forward(sys.argv[1:], callpath):
+        return 0
+    trace.mark("instance lookup done")
+
+    from PyQt5.QtWidgets import QApplication
+    trace.mark("Qt widgets imported")
+
+    from clipboard2image import Clipboard2Image
+    trace.mark("window module imported")
+
     app = QApplication([])
+    trace.mark("QApplication created")
     win = Clipboard2Image(app, callpath)
+    trace.mark("window created")
+
+    # Rendered stylesheets are cached per theme, so only the first launch
+    # with a theme (or after an update of qt_material) renders the template.
+    win.stylesheets.apply(app, win.appTheme)
+    trace.mark("stylesheet applied")
 
-    apply_stylesheet(app, theme=win.appTheme)
+    # Everything the home screen does not need waits for its first frame.
+    def __deferredInit() -> None:
+        trace.mark("home screen painted")
 
-    with open("style/style.qss", "r") as stylesheet:
-        app.setStyleSheet(
-            app.styleSheet() + stylesheet.read().format(**os.environ)
+        server.argumentsReceived.connect(
+            lambda args, path: Clipboard2Image.newWindow(app, path, args)
         )
+        server.listen()
+        trace.mark("instance server listening")
+
+        # Undo snapshots spilled by instances that crashed are only removed
+        # here, the running ones clean up after themselves.
+        from history import sweepSpillDirectories
 
+        threading.Thread(target=sweepSpillDirectories, daemon=True).start()
+
+        trace.report()
+
+    win.firstPainted.connect(__deferredInit)
     win.show()
 
     return app.exec()
 
 
 if __name__ == "__main__":
+    # Frozen builds re-enter this script in batch worker processes.
+    if getattr(sys, "frozen", False):
+        import multiprocessing
+
+        multiprocessing.freeze_support()
     sys.exit(main())
@@ -0,0 +1,446 @@
+from PIL import Image
+
+from transforms import (
+    affineImage,
+    reduceImage,
+    resizeImage,
+    rotationMatrix,
+    transposeImage
+)
+from imagecache import ZoomPyramid, levelDepth
+from encodedsource import EncodedSource, orientationTag
+
+import math
+
+identityMatrix = (1.0, 0.0, 0.0, 0.0, 1.0, 0.0,)
+tolerance = 1e-9
+
+# Linear part (a, b, d, e) of the output-to-input mapping of every
+# Image.transpose method.
+transposeMatrices = {
+    Image.FLIP_LEFT_RIGHT: (-1, 0, 0, 1),
+    Image.FLIP_TOP_BOTTOM: (1, 0, 0, -1),
+    Image.ROTATE_90: (0, -1, 1, 0),
+    Image.ROTATE_180: (-1, 0, 0, -1),
+    Image.ROTATE_270: (0, 1, -1, 0),
+    Image.TRANSPOSE: (0, 1, 1, 0),
+    Image.TRANSVERSE: (0, -1, -1, 0)
+}
+
+
+# The transpose that shows the stored pixels the way each EXIF Orientation
+# value tells viewers to, the same table ImageOps.exif_transpose uses.
+orientationMethods = {
+    2: Image.FLIP_LEFT_RIGHT,
+    3: Image.ROTATE_180,
+    4: Image.FLIP_TOP_BOTTOM,
+    5: Image.TRANSPOSE,
+    6: Image.ROTATE_270,
+    7: Image.TRANSVERSE,
+    8: Image.ROTATE_90
+}
+
+
+def compose(outer: tuple, inner: tuple) -> tuple:
+    a1, b1, c1, d1, e1, f1 = outer
+    a2, b2, c2, d2, e2, f2 = inner
+    return (
+        a1 * a2 + b1 * d2,
+        a1 * b2 + b1 * e2,
+        a1 * c2 + b1 * f2 + c1,
+        d1 * a2 + e1 * d2,
+        d1 * b2 + e1 * e2,
+        d1 * c2 + e1 * f2 + f1,
+    )
+
+
+def _close(x: float, y: float) -> bool:
+    return abs(x - y) <= tolerance * max(1.0, abs(x), abs(y))
+
+
+class Transpose:
+    fillcolor = None
+
+    def __init__(self, method: int) -> None:
+        self.method = method
+
+    def outputSize(self, size: tuple) -> tuple:
+        if transposeMatrices[self.method][0] == 0:
+            return (size[1], size[0],)
+        return size
+
+    def matrix(self, size: tuple) -> tuple:
+        a, b, d, e = transposeMatrices[self.method]
+        width, height = size
+        # Translate so that the output rectangle lands on the input one.
+        c = width if a + b < 0 else 0
+        f = height if d + e < 0 else 0
+        return (
+            float(a), float(b), float(c), float(d), float(e), float(f),
+        )
+
+    def inverse(self) -> "Transpose":
+        return Transpose({
+            Image.ROTATE_90: Image.ROTATE_270,
+            Image.ROTATE_270: Image.ROTATE_90
+        }.get(self.method, self.method))
+
+    def apply(self, image: Image.Image, progress=None) -> Image.Image:
+        return transposeImage(image, self.method, progress)
+
+
+class Rotate:
+    def __init__(self, angle: float, fillcolor=None) -> None:
+        self.angle = angle % 360.0
+        self.fillcolor = fillcolor
+
+    def outputSize(self, size: tuple) -> tuple:
+        return rotationMatrix(size, self.angle)[0]
+
+    def matrix(self, size: tuple) -> tuple:
+        return rotationMatrix(size, self.angle)[1]
+
+
+class Resize:
+    fillcolor = None
+
+    def __init__(self, size: tuple, resample: int = Image.ANTIALIAS) -> None:
+        self.size = tuple(size)
+        self.resample = resample
+
+    def outputSize(self, size: tuple) -> tuple:
+        return self.size
+
+    def matrix(self, size: tuple) -> tuple:
+        return (
+            size[0] / self.size[0], 0.0, 0.0,
+            0.0, size[1] / self.size[1], 0.0,
+        )
+
+    def apply(self, image: Image.Image, progress=None) -> Image.Image:
+        return resizeImage(image, self.size, self.resample, progress)
+
+
+class Affine:
+    def __init__(
+        self, size: tuple, matrix: tuple, fillcolor=None,
+        resample: int = Image.BICUBIC
+    ) -> None:
+        self.size = size
+        self.matrix = matrix
+        self.fillcolor = fillcolor
+        self.resample = resample
+
+    def apply(self, image: Image.Image, progress=None) -> Image.Image:
+        a, b, c, d, e, f = self.matrix
+
+        # Bicubic sampling does not filter, so strong reductions are first
+        # box-reduced by an integer factor to keep the result alias free.
+        factor = int(min(math.hypot(a, d), math.hypot(b, e)))
+        if factor >= 2 and image.mode in ZoomPyramid.reducibleModes:
+            image = reduceImage(image, factor)
+            a, b, c, d, e, f = (v / factor for v in self.matrix)
+
+        return affineImage(
+            image, self.size, (a, b, c, d, e, f,), self.fillcolor,
+            self.resample, progress
+        )
+
+
+def imageOrientation(image: Image.Image) -> int:
+    try:
+        orientation = image.getexif().get(orientationTag, 1)
+    except (OSError, ValueError, SyntaxError):
+        return 1
+    return orientation if orientation in orientationMethods else 1
+
+
+def orientationOperations(orientation: int) -> tuple:
+    if orientation not in orientationMethods:
+        return ()
+    return (Transpose(orientationMethods[orientation]),)
+
+
+def orientationAfter(orientation: int, operations: tuple) -> int:
+    # The output-to-input mappings of the flips and quarter turns compose
+    # into the one that maps the final pixels back to the stored ones,
+    # and that mapping is exactly one of the eight orientations.
+    a, b, d, e = 1, 0, 0, 1
+    for operation in orientationOperations(orientation) + operations:
+        a2, b2, d2, e2 = transposeMatrices[operation.method]
+        a, b, d, e = (
+            a * a2 + b * d2, a * b2 + b * e2,
+            d * a2 + e * d2, d * b2 + e * e2,
+        )
+    if (a, b, d, e) == (1, 0, 0, 1):
+        return 1
+    return next(
+        orientation for orientation, method in orientationMethods.items()
+        if transposeMatrices[method] == (a, b, d, e)
+    )
+
+
+def rotation(angle: float, fillcolor=None):
+    angle = angle % 360.0
+    if angle == 0:
+        return None
+    if angle in (90.0, 180.0, 270.0):
+        return Transpose({
+            90.0: Image.ROTATE_90,
+            180.0: Image.ROTATE_180,
+            270.0: Image.ROTATE_270
+        }[angle])
+    return Rotate(angle, fillcolor)
+
+
+def outputSize(size: tuple, operations: tuple) -> tuple:
+    for operation in operations:
+        size = operation.outputSize(size)
+    return size
+
+
+def _chains(operations: tuple) -> list:
+    # Only rotations uncover corners, and None is a fill of its own (black
+    # or transparent), so rotations with different fills each get a chain.
+    chains = []
+    chain = []
+    fillcolor = None
+    filled = False
+
+    for operation in operations:
+        if isinstance(operation, Rotate):
+            if filled and operation.fillcolor != fillcolor:
+                chains.append((chain, fillcolor,))
+                chain = []
+            fillcolor = operation.fillcolor
+            filled = True
+        chain.append(operation)
+
+    if chain:
+        chains.append((chain, fillcolor,))
+
+    return chains
+
+
+def _fuseChain(size: tuple, chain: list) -> tuple:
+    matrix = identityMatrix
+    resample = Image.ANTIALIAS
+
+    for operation in chain:
+        matrix = compose(matrix, operation.matrix(size))
+        size = operation.outputSize(size)
+        if isinstance(operation, Rotate):
+            resample = Image.BICUBIC
+
+    return matrix, size, resample
+
+
+def _axisAligned(matrix: tuple, inputSize: tuple, size: tuple):
+    a, b, c, d, e, f = matrix
+
+    if _close(b, 0) and _close(d, 0):
+        pattern = (1 if a > 0 else -1, 0, 0, 1 if e > 0 else -1)
+    elif _close(a, 0) and _close(e, 0):
+        pattern = (0, 1 if b > 0 else -1, 1 if d > 0 else -1, 0)
+    else:
+        return None
+
+    # The mapped output rectangle has to cover exactly the input
+    # rectangle, otherwise the chain leaves fill around the image.
+    corners = [
+        (a * x + b * y + c, d * x + e * y + f,)
+        for x, y in ((0, 0), (size[0], size[1]))
+    ]
+    xs = sorted(x for x, _ in corners)
+    ys = sorted(y for _, y in corners)
+    if not (
+        _close(xs[0], 0) and _close(xs[1], inputSize[0])
+        and _close(ys[0], 0) and _close(ys[1], inputSize[1])
+    ):
+        return None
+
+    for method, linear in transposeMatrices.items():
+        if linear == pattern:
+            return method
+    return False
+
+
+def fuse(size: tuple, operations: tuple) -> list:
+    steps = []
+
+    for chain, fillcolor in _chains(operations):
+        matrix, chainSize, resample = _fuseChain(size, chain)
+
+        method = _axisAligned(matrix, size, chainSize)
+        if method is None:
+            steps.append(Affine(chainSize, matrix, fillcolor, resample))
+        else:
+            if method is not False:
+                steps.append(Transpose(method))
+            transposedSize = (
+                Transpose(method).outputSize(size) if method is not False
+                else size
+            )
+            if transposedSize != chainSize:
+                steps.append(Resize(chainSize, resample))
+
+        size = chainSize
+
+    return steps
+
+
+def applyOperations(
+    image: Image.Image, operations: tuple, progress=None
+) -> Image.Image:
+    steps = fuse(image.size, operations)
+
+    for index, step in enumerate(steps):
+        def __progress(done: int, total: int, index: int = index) -> None:
+            if progress is not None:
+                progress(index * total + done, len(steps) * total)
+
+        image = step.apply(image, __progress)
+
+    return image
+
+
+class ImageDocument:
+    def __init__(
+        self, source: Image.Image, operations: tuple = (),
+        imageFormat: str = None, pyramid: ZoomPyramid = None,
+        encoded: EncodedSource = None, orientation: int = None
+    ) -> None:
+        self.source = source
+        self.operations = tuple(operations)
+        self.format = imageFormat if imageFormat is not None else source.format
+        self.mode = source.mode
+        self.info = source.info
+
+        # The pixels are shown the way the file's EXIF Orientation asks
+        # for, which comes before any edit and is not an edit itself.
+        self.orientation = (
+            orientation if orientation is not None
+            else imageOrientation(source)
+        )
+
+        self.encoded = encoded
+        if encoded is None and not operations:
+            self.encoded = EncodedSource.fromImage(source, self.orientation)
+        self._steps = orientationOperations(self.orientation) + self.operations
+        self.size = outputSize(source.size, self._steps)
+
+        self._pyramid = pyramid if pyramid is not None else ZoomPyramid(source)
+        self._levels = {}
+
+    def load(self) -> None:
+        self._pyramid.load()
+
+    def isModified(self) -> bool:
+        return bool(self.operations)
+
+    def encodedAs(self, imageFormat: str) -> EncodedSource:
+        # Unmodified pixels saved in the format they were read from are
+        # the original bytes, so those are copied instead of encoded again.
+        if (
+            self.encoded is None
+            or self.encoded.format != imageFormat
+            or not self.encoded.isCurrent()
+        ):
+            return None
+        if all(
+            isinstance(operation, Transpose) for operation in self.operations
+        ):
+            orientation = orientationAfter(self.orientation, self.operations)
+            if orientation == self.encoded.fileOrientation:
+                return self.encoded
+
+            # Flips and quarter turns of a JPEG only change how viewers are
+            # told to show it, so the compressed data is kept bit for bit.
+            if imageFormat == "JPEG":
+                return self.encoded.withOrientation(orientation)
+        return None
+
+    def withOperation(self, operation) -> "ImageDocument":
+        if operation is None:
+            return self
+        return ImageDocument(
+            self.source,
+            self.operations + (operation,),
+            self.format,
+            self._pyramid,
+            self.encoded,
+            self.orientation
+        )
+
+    def cachedLevels(self) -> dict:
+        return dict(self._levels)
+
+    def setLevel(self, depth: int, level: Image.Image) -> None:
+        level.format = self.format
+        self._levels[depth] = level
+
+    def releaseLevels(self) -> None:
+        self._levels = {}
+
+    def nearestLevel(self, depth: int) -> tuple:
+        # The rendered level closest to the depth, as (depth, level), without
+        # rendering anything: a coarser level scales up cheaply, a finer one
+        # is only worth it one level away.
+        levels = {} if self._steps else self._pyramid.cachedLevels()
+        levels.update(self._levels)
+        if depth in levels:
+            return (depth, levels[depth],)
+
+        coarser = [level for level in levels if level > depth]
+        if coarser:
+            return (min(coarser), levels[min(coarser)],)
+        if depth - 1 in levels:
+            return (depth - 1, levels[depth - 1],)
+        return None
+
+    def depthFor(self, scale: float) -> int:
+        return levelDepth(self.size, scale, self._pyramid.minSize)
+
+    def levelFor(self, scale: float) -> Image.Image:
+        return self.renderLevel(self.depthFor(scale))
+
+    def flattened(self, progress=None) -> "ImageDocument":
+        # The steps rendered once into a document of their own, so several
+        # outputs derived from it do not each resample the source again.
+        if not self._steps:
+            return self
+        return ImageDocument(
+            self.render(progress), (), self.format, orientation=1
+        )
+
+    def render(self, progress=None) -> Image.Image:
+        return self.renderLevel(0, progress)
+
+    def renderLevel(self, depth: int, progress=None) -> Image.Image:
+        level = self._levels.get(depth)
+        if level is not None:
+            return level
+
+        if not self._steps:
+            return self._pyramid.level(depth)
+
+        source = self._pyramid.level(
+            levelDepth(self.source.size, 0.5 ** depth, self._pyramid.minSize)
+        )
+        levelSize = (
+            max(1, round(self.size[0] * 0.5 ** depth)),
+            max(1, round(self.size[1] * 0.5 ** depth)),
+        )
+
+        # The pyramid level and the display size are expressed as two more
+        # resizes, so they fold into the same single resample as the edits.
+        level = applyOperations(
+            source,
+            (Resize(self.source.size),) + self._steps
+            + (Resize(levelSize),),
+            progress
+        )
+        level.format = self.format
+
+        self._levels[depth] = level
+        return level
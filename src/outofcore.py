@@ -0,0 +1,146 @@
+from PIL import Image
+
+from contextlib import contextmanager
+
+import ctypes
+import mmap
+import os
+import sys
+import tempfile
+import threading
+
+# Bytes per pixel of Pillow's own storage for every mode a scratch file can
+# hold; three channel modes are padded to four bytes, just like in memory.
+scratchModes = {
+    "1": 1, "L": 1, "P": 1,
+    "I;16": 2, "I;16L": 2, "I;16B": 2,
+    "LA": 4, "La": 4, "PA": 4, "RGB": 4, "RGBA": 4, "RGBa": 4, "RGBX": 4,
+    "CMYK": 4, "YCbCr": 4, "LAB": 4, "HSV": 4, "I": 4, "F": 4
+}
+
+# Images over the ceiling (in bytes, None is a quarter of the physical
+# memory) are kept in memory mapped scratch files in the directory (None is
+# the system's temporary directory), so the operating system pages them in
+# and out instead of the process running out of memory.
+ceiling = None
+directory = None
+
+# Scratch images are built with Image.core.map_buffer, which is not a
+# public API; a Pillow without it keeps every image in memory instead.
+canMap = callable(getattr(Image.core, "map_buffer", None))
+
+# Pillow refuses images over twice its pixel limit as decompression bombs,
+# far below what scratch files can hold. The loaders that can decode into
+# scratch files open images under this limit instead; Pillow's own limit is
+# left alone, so every other Image.open in the process keeps its checks.
+maxPixels = 1 << 30
+_limitLock = threading.Lock()
+
+
+def physicalMemory() -> int:
+    if sys.platform == "win32":
+        class MemoryStatus(ctypes.Structure):
+            _fields_ = [
+                ("dwLength", ctypes.c_ulong),
+                ("dwMemoryLoad", ctypes.c_ulong),
+                ("ullTotalPhys", ctypes.c_ulonglong),
+                ("ullAvailPhys", ctypes.c_ulonglong),
+                ("ullTotalPageFile", ctypes.c_ulonglong),
+                ("ullAvailPageFile", ctypes.c_ulonglong),
+                ("ullTotalVirtual", ctypes.c_ulonglong),
+                ("ullAvailVirtual", ctypes.c_ulonglong),
+                ("ullAvailExtendedVirtual", ctypes.c_ulonglong)
+            ]
+
+        status = MemoryStatus()
+        status.dwLength = ctypes.sizeof(MemoryStatus)
+        if ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status)):
+            return status.ullTotalPhys
+        return 8 << 30
+
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (AttributeError, ValueError, OSError):
+        return 8 << 30
+
+
+def configure(
+    memoryLimit: int = None, scratchDirectory: str = None,
+    pixelLimit: int = None
+) -> None:
+    global ceiling, directory, maxPixels
+
+    ceiling = memoryLimit
+    directory = scratchDirectory
+    if pixelLimit is not None:
+        maxPixels = pixelLimit
+
+
+@contextmanager
+def largeImages():
+    # Pillow only checks the limit while reading the header in Image.open,
+    # so it is raised just for that and restored before anything else runs.
+    # The lock keeps two loaders from restoring each other's limit.
+    with _limitLock:
+        limit = Image.MAX_IMAGE_PIXELS
+        if limit is not None:
+            Image.MAX_IMAGE_PIXELS = max(limit, maxPixels)
+        try:
+            yield
+        finally:
+            Image.MAX_IMAGE_PIXELS = limit
+
+
+def openImage(fp) -> Image.Image:
+    with largeImages():
+        return Image.open(fp)
+
+
+def memoryCeiling() -> int:
+    if ceiling is None:
+        return physicalMemory() // 4
+    return ceiling
+
+
+def imageBytes(mode: str, size: tuple) -> int:
+    return scratchModes.get(mode, 4) * size[0] * size[1]
+
+
+def exceeds(mode: str, size: tuple) -> bool:
+    return (
+        canMap and mode in scratchModes
+        and imageBytes(mode, size) > memoryCeiling()
+    )
+
+
+def scratchImage(mode: str, size: tuple) -> Image.Image:
+    width, height = size
+    stride = width * scratchModes[mode]
+
+    # The mapping keeps its own handle, so the file is gone as soon as the
+    # last image using its pixels is.
+    with tempfile.TemporaryFile(suffix=".scratch", dir=directory) as file:
+        file.truncate(max(1, stride * height))
+        buffer = mmap.mmap(file.fileno(), 0)
+
+    # The same construction Image.frombuffer uses for the modes it maps,
+    # with the layout of Pillow's own storage so that every mode maps and
+    # pastes, decoders and encoders work on the file directly.
+    return Image.new(mode, (1, 1,))._new(
+        Image.core.map_buffer(buffer, size, "raw", 0, (mode, stride, 1))
+    )
+
+
+def newImage(mode: str, size: tuple) -> Image.Image:
+    if exceeds(mode, size):
+        return scratchImage(mode, size)
+    return Image.new(mode, size)
+
+
+def load(image: Image.Image) -> Image.Image:
+    # Pillow decodes into the storage an image already has when mode and
+    # size match, so a file too large for memory streams into scratch.
+    if getattr(image, "im", None) is None and exceeds(image.mode, image.size):
+        image.im = scratchImage(image.mode, image.size).im
+    image.load()
+    return image
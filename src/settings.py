@@ -0,0 +1,163 @@
+from PyQt5.QtCore import (
+    QCoreApplication,
+    QObject,
+    QRunnable,
+    QThreadPool,
+    QTimer,
+    pyqtSignal
+)
+
+import copy
+import os
+import toml
+
+from workers import JobSignals
+
+
+class SettingsWriteJob(QRunnable):
+    def __init__(self, path: str, text: str) -> None:
+        super().__init__()
+        self.setAutoDelete(False)
+
+        self.path = path
+        self.text = text
+
+        self.signals = JobSignals()
+
+    def run(self) -> None:
+        # The new file is complete on disk before it replaces the old one,
+        # so a crash leaves either the previous settings or the new ones.
+        temporaryPath = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(temporaryPath, "w") as settingsFile:
+                settingsFile.write(self.text)
+                settingsFile.flush()
+                os.fsync(settingsFile.fileno())
+            os.replace(temporaryPath, self.path)
+            self.signals.finished.emit(self.path)
+        except OSError as e:
+            try:
+                os.remove(temporaryPath)
+            except OSError:
+                pass
+            self.signals.failed.emit(e)
+
+
+class SettingsStore(QObject):
+    failed = pyqtSignal(object)
+
+    writeDelay = 500
+
+    defaults = {
+        "theme": {
+            "xml": "light_blue.xml",
+            "name": "Light Blue"
+        },
+        "history": {
+            "memory": 64,
+            "disk": 512
+        },
+        "view": {
+            "zoom": 100
+        },
+        "cache": {
+            "documents": 8
+        },
+        "batch": {
+            "workers": 0
+        },
+        "memory": {
+            "ceiling": 0,
+            "scratch": "",
+            "pixels": 1 << 30
+        },
+        "export": {
+            "targets": []
+        }
+    }
+
+    def __init__(self, path: str, parent: QObject = None) -> None:
+        super().__init__(parent)
+
+        self.path = path
+        self.loadError = None
+
+        self._values = None
+        self._timer = None
+        self._writer = None
+        self._jobs = set()
+
+    def load(self) -> None:
+        # Loaded once per process, every window reads the same values.
+        if self._values is not None:
+            return
+
+        self._values = copy.deepcopy(self.defaults)
+        try:
+            with open(self.path, "r") as settingsFile:
+                stored = toml.load(settingsFile)
+        except FileNotFoundError:
+            self._scheduleWrite()
+            return
+        except (OSError, toml.TomlDecodeError) as e:
+            # The broken file is replaced by the next write.
+            self.loadError = e
+            self._scheduleWrite()
+            return
+
+        for section, values in stored.items():
+            if type(values) is dict:
+                self._values.setdefault(section, {}).update(values)
+            else:
+                self._values[section] = values
+
+    def get(self, section: str, key: str):
+        self.load()
+        return self._values.get(section, {}).get(
+            key, self.defaults.get(section, {}).get(key)
+        )
+
+    def set(self, section: str, key: str, value) -> None:
+        self.load()
+        if self._values.setdefault(section, {}).get(key) == value:
+            return
+        self._values[section][key] = value
+        self._scheduleWrite()
+
+    def flush(self) -> None:
+        # Pending changes are written right away and every write finishes
+        # before returning, which is what quitting needs.
+        if self._timer is not None and self._timer.isActive():
+            self._timer.stop()
+            self._write()
+        if self._writer is not None:
+            self._writer.waitForDone()
+
+    def _scheduleWrite(self) -> None:
+        # Changes made within writeDelay of each other end up in one write,
+        # and the UI thread never waits for the disk.
+        if self._timer is None:
+            self._timer = QTimer(self)
+            self._timer.setSingleShot(True)
+            self._timer.setInterval(self.writeDelay)
+            self._timer.timeout.connect(self._write)
+
+            self._writer = QThreadPool(self)
+            self._writer.setMaxThreadCount(1)
+
+            if (app := QCoreApplication.instance()) is not None:
+                app.aboutToQuit.connect(self.flush)
+        self._timer.start()
+
+    def _write(self) -> None:
+        job = SettingsWriteJob(self.path, toml.dumps(self._values))
+        job.signals.finished.connect(lambda _: self._jobs.discard(job))
+        job.signals.failed.connect(lambda e: self._writeFailed(job, e))
+        self._jobs.add(job)
+
+        self._writer.start(job)
+
+    def _writeFailed(self, job: SettingsWriteJob, e: Exception) -> None:
+        self._jobs.discard(job)
+        self.failed.emit(e)
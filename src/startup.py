@@ -0,0 +1,56 @@
+import sys
+import time
+
+# Checked before anything else is imported, so the GUI never pays for the
+# command line and batch modules and a conversion never pays for Qt widgets.
+headlessOptions = [
+    "--paste", "--in", "--batch", "--watch", "-o", "--output", "--stdout",
+    "-h", "--help"
+]
+
+
+def isHeadless(argv: list) -> bool:
+    return any(arg.split("=")[0] in headlessOptions for arg in argv)
+
+
+class StartupTrace:
+    def __init__(self) -> None:
+        self.enabled = False
+        self.start = time.perf_counter()
+        self._marks = []
+        self._reported = False
+
+    def enable(self) -> None:
+        self.enabled = True
+        self.mark("startup trace enabled")
+
+    def mark(self, label: str) -> None:
+        if self.enabled:
+            self._marks.append(
+                (time.perf_counter(), len(sys.modules), label,)
+            )
+
+    def report(self, file=None) -> None:
+        if not self.enabled or self._reported:
+            return
+        self._reported = True
+
+        file = file if file is not None else sys.stderr
+        print("    total      step  modules  phase", file=file)
+
+        previous, previousModules = self.start, None
+        for timestamp, modules, label in self._marks:
+            added = (
+                f"+{modules - previousModules}"
+                if previousModules is not None else str(modules)
+            )
+            print(
+                f"{(timestamp - self.start) * 1000:7.1f}ms \
+{(timestamp - previous) * 1000:7.1f}ms {added:>8}  {label}",
+                file=file
+            )
+            previous, previousModules = timestamp, modules
+
+
+# Created when main.py starts, so every mark is relative to the launch.
+trace = StartupTrace()
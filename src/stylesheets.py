@@ -0,0 +1,210 @@
+from PyQt5.QtCore import QDir
+from PyQt5.QtGui import QColor, QFontDatabase, QGuiApplication, QPalette
+
+import hashlib
+import importlib.util
+import json
+import os
+import shutil
+
+
+def qtMaterialLocation() -> str:
+    spec = importlib.util.find_spec("qt_material")
+    if spec is None or not spec.submodule_search_locations:
+        return None
+    return list(spec.submodule_search_locations)[0]
+
+
+def qtMaterialVersion() -> str:
+    # importlib.metadata costs more than rendering the stylesheet, so the
+    # version is read from the distribution directory next to the package.
+    location = qtMaterialLocation()
+    if location is None:
+        return "unknown"
+
+    try:
+        for name in os.listdir(os.path.dirname(location)):
+            stem, extension = os.path.splitext(name)
+            distribution, _, version = stem.partition("-")
+            if (
+                extension in [".dist-info", ".egg-info"]
+                and distribution.lower().replace("-", "_") == "qt_material"
+            ):
+                return version
+    except OSError:
+        pass
+
+    # Frozen builds bundle qt_material without its metadata and extract it
+    # anew on every start, so the theme files it renders from are hashed.
+    themesPath = os.path.join(location, "themes")
+    digest = hashlib.blake2b(digest_size=16)
+    try:
+        for path in [os.path.join(location, "material.css.template")] + [
+            os.path.join(themesPath, name)
+            for name in sorted(os.listdir(themesPath))
+        ]:
+            with open(path, "rb") as themeFile:
+                digest.update(themeFile.read())
+    except OSError:
+        return "unknown"
+    return digest.hexdigest()
+
+
+class StylesheetCache:
+    def __init__(
+        self, directory: str, stylePath: str = "style/style.qss"
+    ) -> None:
+        self.directory = directory
+        self.stylePath = stylePath
+
+        self._version = None
+        self._themes = None
+        self._fontsAdded = False
+
+    def version(self) -> str:
+        if self._version is None:
+            self._version = qtMaterialVersion()
+        return self._version
+
+    def themes(self) -> list:
+        if self._themes is not None:
+            return self._themes
+
+        themesPath = os.path.join(self.directory, "themes.json")
+        try:
+            with open(themesPath, "r") as themesFile:
+                cached = json.load(themesFile)
+            if cached["version"] == self.version():
+                self._themes = list(cached["themes"])
+                return self._themes
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+        from qt_material import list_themes
+
+        self._themes = list_themes()
+        self._write(themesPath, {
+            "version": self.version(),
+            "themes": self._themes
+        })
+        return self._themes
+
+    def apply(self, app: QGuiApplication, theme: str) -> None:
+        with open(self.stylePath, "r") as stylesheet:
+            style = stylesheet.read()
+
+        key = "{}:{}:{}".format(
+            self.version(), theme,
+            hashlib.blake2b(style.encode(), digest_size=16).hexdigest()
+        )
+
+        # A hit restores what qt_material leaves behind (environment, fonts,
+        # palette and icon search paths) without importing it at all, so
+        # neither jinja2 nor the template is touched.
+        entry = self._load(theme, key)
+        if entry is None:
+            entry = self._build(app, theme, key, style)
+            if entry is None:
+                return
+        else:
+            self._restore(entry)
+
+        app.setStyleSheet(entry["stylesheet"])
+
+    def _entryPath(self, theme: str) -> str:
+        return os.path.join(
+            self.directory, f"{os.path.splitext(theme)[0]}.json"
+        )
+
+    def _iconsPath(self, theme: str) -> str:
+        return os.path.join(
+            self.directory, f"{os.path.splitext(theme)[0]}-icons"
+        )
+
+    def _load(self, theme: str, key: str) -> dict:
+        try:
+            with open(self._entryPath(theme), "r") as entryFile:
+                entry = json.load(entryFile)
+        except (OSError, ValueError):
+            return None
+
+        try:
+            if entry["key"] != key or not os.path.isdir(entry["icons"]):
+                return None
+            return entry
+        except (KeyError, TypeError):
+            return None
+
+    def _build(
+        self, app: QGuiApplication, theme: str, key: str, style: str
+    ) -> dict:
+        from qt_material import apply_stylesheet, get_theme
+
+        apply_stylesheet(app, theme=theme)
+        colors = get_theme(theme)
+        if colors is None:
+            return None
+
+        location = qtMaterialLocation()
+        fontsPath = os.path.join(location, "fonts", "roboto")
+
+        # The generated icons are shared by every theme in qt_material's
+        # own directory, so each theme keeps a copy of its colours.
+        iconsPath = self._iconsPath(theme)
+        try:
+            shutil.rmtree(iconsPath, ignore_errors=True)
+            shutil.copytree(QDir.searchPaths("icon")[-1], iconsPath)
+        except (OSError, IndexError):
+            iconsPath = QDir.searchPaths("icon")[-1]
+
+        entry = {
+            "key": key,
+            "stylesheet": app.styleSheet() + style.format(**os.environ),
+            "environ": {
+                name: value for name, value in os.environ.items()
+                if name in colors or name.startswith("QTMATERIAL_")
+            },
+            "fonts": sorted(
+                os.path.join(fontsPath, font)
+                for font in os.listdir(fontsPath) if font.endswith(".ttf")
+            ),
+            "icons": iconsPath
+        }
+        self._fontsAdded = True
+
+        self._write(self._entryPath(theme), entry)
+        self._setIconPath(entry)
+        return entry
+
+    def _restore(self, entry: dict) -> None:
+        os.environ.update(entry["environ"])
+
+        if not self._fontsAdded:
+            for font in entry["fonts"]:
+                QFontDatabase.addApplicationFont(font)
+            self._fontsAdded = True
+
+        primaryColor = entry["environ"]["QTMATERIAL_PRIMARYCOLOR"]
+        palette = QGuiApplication.palette()
+        palette.setColor(QPalette.PlaceholderText, QColor(
+            *[int(primaryColor[i:i + 2], 16) for i in range(1, 6, 2)] + [92]
+        ))
+        QGuiApplication.setPalette(palette)
+
+        self._setIconPath(entry)
+
+    def _setIconPath(self, entry: dict) -> None:
+        # Replaced rather than appended, otherwise a theme switched back to
+        # later would still find the icons of the previous one first.
+        QDir.setSearchPaths("icon", [entry["icons"]])
+
+    def _write(self, path: str, data: dict) -> None:
+        # The cache only saves time, so failing to write it is not an error.
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            temporaryPath = f"{path}.{os.getpid()}.tmp"
+            with open(temporaryPath, "w") as cacheFile:
+                json.dump(data, cacheFile)
+            os.replace(temporaryPath, path)
+        except OSError:
+            pass
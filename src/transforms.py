@@ -0,0 +1,217 @@
+from PIL import Image
+
+import math
+
+from outofcore import exceeds, newImage
+
+bandPixels = 1 << 22
+tileSize = 2048
+
+
+def _bands(size: tuple) -> list:
+    width, height = size
+    bandHeight = max(1, min(height, bandPixels // max(1, width)))
+    return [
+        (top, min(top + bandHeight, height),)
+        for top in range(0, height, bandHeight)
+    ]
+
+
+def _assemble(
+    image: Image.Image, size: tuple, renderBand, progress=None,
+    mode: str = None
+) -> Image.Image:
+    bands = _bands(size)
+    if len(bands) == 1:
+        result = renderBand(0, size[1])
+        if progress is not None:
+            progress(1, 1)
+        return result
+
+    # Bands of a result too large for memory go straight to a scratch
+    # file, so only the band being rendered is ever held in full.
+    result = newImage(mode or image.mode, size)
+    result.info = image.info.copy()
+
+    for done, (top, bottom) in enumerate(bands, 1):
+        result.paste(renderBand(top, bottom), (0, top,))
+        if progress is not None:
+            progress(done, len(bands))
+
+    return result
+
+
+def fitSize(size: tuple, box: tuple) -> tuple:
+    scale = min(box[0] / size[0], box[1] / size[1], 1)
+    return (
+        max(1, round(size[0] * scale)),
+        max(1, round(size[1] * scale)),
+    )
+
+
+def resizeImage(
+    image: Image.Image, size: tuple, resample: int = Image.ANTIALIAS,
+    progress=None
+) -> Image.Image:
+    if image.mode in ["1", "P"]:
+        return image.resize(size, resample)
+
+    scaleY = image.size[1] / size[1]
+
+    def __band(top: int, bottom: int) -> Image.Image:
+        return image.resize(
+            (size[0], bottom - top,),
+            resample,
+            box=(0, top * scaleY, image.size[0], bottom * scaleY,)
+        )
+
+    return _assemble(image, size, __band, progress)
+
+
+def _transposedBox(box: tuple, size: tuple, method: int) -> tuple:
+    left, top, right, bottom = box
+    width, height = size
+    return {
+        Image.FLIP_LEFT_RIGHT: (width - right, top, width - left, bottom,),
+        Image.FLIP_TOP_BOTTOM: (left, height - bottom, right, height - top,),
+        Image.ROTATE_90: (top, width - right, bottom, width - left,),
+        Image.ROTATE_180: (
+            width - right, height - bottom, width - left, height - top,
+        ),
+        Image.ROTATE_270: (height - bottom, left, height - top, right,),
+        Image.TRANSPOSE: (top, left, bottom, right,),
+        Image.TRANSVERSE: (
+            height - bottom, width - right, height - top, width - left,
+        )
+    }[method]
+
+
+def transposeImage(
+    image: Image.Image, method: int, progress=None
+) -> Image.Image:
+    if not exceeds(image.mode, image.size):
+        return image.transpose(method)
+
+    # Quarter turns read columns of the source, so a scratch backed image
+    # is turned in square tiles: the rows being read and the columns being
+    # written stay a few megabytes each instead of the whole file.
+    width, height = image.size
+    size = _transposedBox((0, 0, width, height,), image.size, method)[2:]
+    result = newImage(image.mode, size)
+    result.info = image.info.copy()
+    if image.mode in ["P", "PA"]:
+        result.putpalette(image.getpalette())
+
+    tiles = [
+        (left, top, min(left + tileSize, width), min(top + tileSize, height),)
+        for top in range(0, height, tileSize)
+        for left in range(0, width, tileSize)
+    ]
+    for done, box in enumerate(tiles, 1):
+        result.paste(
+            image.crop(box).transpose(method),
+            _transposedBox(box, image.size, method)[:2]
+        )
+        if progress is not None:
+            progress(done, len(tiles))
+
+    return result
+
+
+def reduceImage(
+    image: Image.Image, factor: int, progress=None
+) -> Image.Image:
+    if not exceeds(image.mode, image.size):
+        return image.reduce(factor)
+
+    width, height = image.size
+    size = (-(-width // factor), -(-height // factor),)
+
+    def __band(top: int, bottom: int) -> Image.Image:
+        return image.reduce(
+            factor, (0, top * factor, width, min(height, bottom * factor),)
+        )
+
+    return _assemble(image, size, __band, progress)
+
+
+def convertImage(
+    image: Image.Image, mode: str, progress=None
+) -> Image.Image:
+    if not exceeds(image.mode, image.size) and not exceeds(mode, image.size):
+        return image.convert(mode)
+
+    width = image.size[0]
+
+    def __band(top: int, bottom: int) -> Image.Image:
+        return image.crop((0, top, width, bottom,)).convert(mode)
+
+    result = _assemble(image, image.size, __band, progress, mode)
+    result.info.pop("transparency", None)
+    return result
+
+
+def encodableImage(
+    image: Image.Image, imageFormat: str, progress=None
+) -> Image.Image:
+    # JPEG has no alpha or palette, so anything but grey and RGB pixels is
+    # flattened to RGB before it is written as one.
+    if imageFormat.upper() == "JPEG" and image.mode not in ["L", "RGB"]:
+        return convertImage(image, "RGB", progress)
+    return image
+
+
+def rotationMatrix(size: tuple, angle: float) -> tuple:
+    # Same matrix and expanded size as Image.rotate(angle, expand=True).
+    width, height = size
+    radians = -math.radians(angle)
+    a, b = round(math.cos(radians), 15), round(math.sin(radians), 15)
+    d, e = round(-math.sin(radians), 15), round(math.cos(radians), 15)
+
+    centerX, centerY = width / 2.0, height / 2.0
+    c = a * -centerX + b * -centerY + centerX
+    f = d * -centerX + e * -centerY + centerY
+
+    xs, ys = [], []
+    for x, y in ((0, 0), (width, 0), (width, height), (0, height)):
+        xs.append(a * x + b * y + c)
+        ys.append(d * x + e * y + f)
+
+    newWidth = math.ceil(max(xs)) - math.floor(min(xs))
+    newHeight = math.ceil(max(ys)) - math.floor(min(ys))
+
+    offsetX, offsetY = -(newWidth - width) / 2.0, -(newHeight - height) / 2.0
+    c, f = a * offsetX + b * offsetY + c, d * offsetX + e * offsetY + f
+
+    return (newWidth, newHeight,), (a, b, c, d, e, f,)
+
+
+def affineImage(
+    image: Image.Image, size: tuple, matrix: tuple, fillcolor=None,
+    resample: int = Image.BICUBIC, progress=None
+) -> Image.Image:
+    a, b, c, d, e, f = matrix
+
+    def __band(top: int, bottom: int) -> Image.Image:
+        return image.transform(
+            (size[0], bottom - top,),
+            Image.AFFINE,
+            (a, b, c + b * top, d, e, f + e * top,),
+            resample,
+            fillcolor=fillcolor
+        )
+
+    return _assemble(image, size, __band, progress)
+
+
+def rotateImage(
+    image: Image.Image, angle: float, fillcolor=None,
+    resample: int = Image.BICUBIC, progress=None
+) -> Image.Image:
+    if angle % 90 == 0:
+        return image.rotate(
+            angle, expand=True, resample=resample, fillcolor=fillcolor
+        )
+
+    size, matrix = rotationMatrix(image.size, angle % 360.0)
+    return affineImage(image, size, matrix, fillcolor, resample, progress)
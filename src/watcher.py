@@ -0,0 +1,224 @@
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
+
+from PyQt5.QtGui import QClipboard
+
+from PIL import Image
+
+from collections import OrderedDict
+
+import hashlib
+import os
+import re
+import time
+
+from clipboardimage import imageFromMimeData
+from workers import JobSignals
+
+
+def differenceHash(image: Image.Image, hashSize: int = 8) -> int:
+    # Thumbnailing with a reducing gap lets PIL box-reduce large captures
+    # first, so the hash costs little more than a single pass over them.
+    small = image.convert("L") if image.mode != "L" else image.copy()
+    small.thumbnail((hashSize * 16, hashSize * 16,), reducing_gap=2.0)
+    small = small.resize((hashSize + 1, hashSize,), Image.BILINEAR)
+
+    pixels = list(small.getdata())
+    value = 0
+    for row in range(hashSize):
+        for column in range(hashSize):
+            left = pixels[row * (hashSize + 1) + column]
+            right = pixels[row * (hashSize + 1) + column + 1]
+            value = (value << 1) | (left > right)
+    return value
+
+
+def exactHash(image: Image.Image) -> bytes:
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{image.mode} {image.size}".encode())
+    digest.update(image.tobytes())
+    return digest.digest()
+
+
+class CaptureJob(QRunnable):
+    def __init__(self, image, watcher: "ClipboardWatcher") -> None:
+        super().__init__()
+        self.setAutoDelete(False)
+
+        self.image = image
+        self.watcher = watcher
+
+        self.signals = JobSignals()
+
+    def run(self) -> None:
+        try:
+            image = self.image
+            if type(image) is list:
+                image = Image.open(image[0])
+            image.load()
+
+            self.signals.finished.emit(self.watcher._store(image))
+        except Exception as e:
+            self.signals.failed.emit(e)
+
+
+class ClipboardWatcher(QObject):
+    captured = pyqtSignal(str)
+    countsChanged = pyqtSignal(int, int)
+    failed = pyqtSignal(object)
+
+    settleDelay = 100
+    maxHashes = 1024
+    namePattern = re.compile(r"\d{8}-\d{6}-[0-9a-f]{8}\.png")
+
+    def __init__(
+        self, clipboard: QClipboard, directory: str, maxFiles: int = 500,
+        parent: QObject = None
+    ) -> None:
+        super().__init__(parent)
+
+        self.clipboard = clipboard
+        self.directory = directory
+        self.maxFiles = maxFiles
+
+        self.capturedCount = 0
+        self.deduplicatedCount = 0
+
+        # One writer thread drains the queue in order, so the hashes and
+        # the rolling directory are only ever touched by that thread.
+        self._writer = QThreadPool(self)
+        self._writer.setMaxThreadCount(1)
+        self._jobs = set()
+
+        self._seen = OrderedDict()
+        self._files = []
+
+        # Bursts of dataChanged (some apps announce every format separately)
+        # settle into a single read of the clipboard.
+        self._settleTimer = QTimer(self)
+        self._settleTimer.setSingleShot(True)
+        self._settleTimer.setInterval(self.settleDelay)
+        self._settleTimer.timeout.connect(self._capture)
+
+        self._active = False
+
+    def isActive(self) -> bool:
+        return self._active
+
+    def start(self) -> None:
+        if self._active:
+            return
+
+        # Only captures written by the watcher take part in the rolling
+        # limit, anything else in the directory is left alone.
+        os.makedirs(self.directory, exist_ok=True)
+        self._files = sorted(
+            (
+                os.path.join(self.directory, name)
+                for name in os.listdir(self.directory)
+                if self.namePattern.fullmatch(name)
+            ),
+            key=os.path.getmtime
+        )
+
+        self.clipboard.dataChanged.connect(self._settleTimer.start)
+        self._active = True
+
+    def stop(self) -> None:
+        if not self._active:
+            return
+
+        self.clipboard.dataChanged.disconnect(self._settleTimer.start)
+        self._settleTimer.stop()
+        self._active = False
+
+    def waitForDone(self) -> None:
+        self._writer.waitForDone()
+
+    def _capture(self) -> None:
+        # Copies made by this process are never captured again.
+        if self.clipboard.ownsClipboard():
+            return
+
+        mimeData = self.clipboard.mimeData()
+        if mimeData is None:
+            return
+
+        try:
+            image = imageFromMimeData(mimeData)
+        except Exception as e:
+            self.failed.emit(e)
+            return
+        if image is None:
+            return
+
+        job = CaptureJob(image, self)
+        job.signals.finished.connect(
+            lambda path: self._captureDone(job, path)
+        )
+        job.signals.failed.connect(lambda e: self._captureFailed(job, e))
+        self._jobs.add(job)
+
+        self._writer.start(job)
+
+    def _captureDone(self, job: CaptureJob, path: str) -> None:
+        self._jobs.discard(job)
+
+        if path is None:
+            self.deduplicatedCount += 1
+        else:
+            self.capturedCount += 1
+            self.captured.emit(path)
+        self.countsChanged.emit(self.capturedCount, self.deduplicatedCount)
+
+    def _captureFailed(self, job: CaptureJob, e: Exception) -> None:
+        self._jobs.discard(job)
+        self.failed.emit(e)
+
+    def _store(self, image: Image.Image) -> str:
+        # Runs on the writer thread. Most captures land in a bucket of their
+        # own, so the exact hash is only paid for once the cheap perceptual
+        # hash has already been seen.
+        perceptual = differenceHash(image)
+        exact = None
+
+        bucket = self._seen.get(perceptual)
+        if bucket:
+            exact = exactHash(image)
+            self._resolve(bucket)
+            if exact in bucket:
+                self._seen.move_to_end(perceptual)
+                return None
+
+        name = exact.hex() if exact is not None else f"{perceptual:016x}"
+        path = os.path.join(
+            self.directory, f"{time.strftime('%Y%m%d-%H%M%S')}-{name[:8]}.png"
+        )
+        image.save(path, "PNG")
+
+        # A capture without an exact hash is remembered by its path, which
+        # is hashed from the lossless PNG when a later capture needs it.
+        self._seen.setdefault(perceptual, set()).add(
+            exact if exact is not None else path
+        )
+        self._seen.move_to_end(perceptual)
+        while len(self._seen) > self.maxHashes:
+            self._seen.popitem(last=False)
+
+        self._files.append(path)
+        while len(self._files) > self.maxFiles:
+            try:
+                os.remove(self._files.pop(0))
+            except OSError:
+                pass
+
+        return path
+
+    def _resolve(self, bucket: set) -> None:
+        for path in [entry for entry in bucket if isinstance(entry, str)]:
+            bucket.discard(path)
+            # Captures rolled out of the directory can no longer be matched.
+            try:
+                with Image.open(path) as saved:
+                    bucket.add(exactHash(saved))
+            except OSError:
+                pass
@@ -0,0 +1,498 @@
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from PIL import Image, ImageFile
+
+import io
+import os
+import time
+
+from operations import ImageDocument
+from outofcore import exceeds, largeImages, openImage, scratchImage
+from transforms import encodableImage
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class JobSignals(QObject):
+    progress = pyqtSignal(int)
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(object)
+    cancelled = pyqtSignal()
+
+
+class BatchSignals(JobSignals):
+    result = pyqtSignal(object)
+
+
+class LoadSignals(JobSignals):
+    preview = pyqtSignal(object)
+
+
+class CancellableWriter:
+    def __init__(self, file, job: "SaveJob") -> None:
+        self.file = file
+        self.job = job
+
+    def write(self, data: bytes) -> int:
+        if self.job.isCancelled():
+            raise JobCancelled()
+        written = self.file.write(data)
+        self.job.bytesWritten += len(data)
+        self.job.signals.progress.emit(self.job.bytesWritten)
+        return written
+
+    def fileno(self) -> int:
+        # Without a file descriptor PIL hands every encoded chunk to write(),
+        # which is where progress is reported and cancellation is checked.
+        raise io.UnsupportedOperation("fileno")
+
+    def __getattr__(self, name: str):
+        return getattr(self.file, name)
+
+
+class ProgressReader:
+    def __init__(self, file, job: "LoadJob") -> None:
+        self.file = file
+        self.job = job
+        self.total = max(1, os.fstat(file.fileno()).st_size)
+        self.percent = -1
+
+    def read(self, size: int = -1) -> bytes:
+        # Decoders read in small blocks, so progress is only reported once
+        # per percent.
+        if self.job.isCancelled():
+            raise JobCancelled()
+        data = self.file.read(size)
+        if (percent := self.file.tell() * 100 // self.total) != self.percent:
+            self.percent = percent
+            self.job.signals.progress.emit(percent)
+            self.job.readProgressed()
+        return data
+
+    def __getattr__(self, name: str):
+        return getattr(self.file, name)
+
+
+class SaveJob(QRunnable):
+    def __init__(
+        self, image: ImageDocument, path: str, imageFormat: str = None,
+        **params
+    ) -> None:
+        super().__init__()
+        self.setAutoDelete(False)
+
+        self.image = image
+        self.path = path
+        self.imageFormat = imageFormat
+        self.params = params
+
+        # Copies of the original bytes never touch the pixels. Otherwise
+        # documents are never modified in place once they are active, so the
+        # reference is a stable snapshot for the worker, which decodes it
+        # and renders the pending operations once at full resolution.
+        targetFormat = imageFormat or Image.registered_extensions().get(
+            os.path.splitext(path)[1].lower()
+        )
+        self.encoded = (
+            image.encodedAs(targetFormat)
+            if targetFormat is not None and not params else None
+        )
+
+        self.bytesWritten = 0
+        self.signals = JobSignals()
+
+        self._cancelled = False
+
+    def cancel(self) -> None:
+        self._cancelled = True
+
+    def isCancelled(self) -> bool:
+        return self._cancelled
+
+    def run(self) -> None:
+        directory, name = os.path.split(os.path.abspath(self.path))
+        partPath = os.path.join(directory, f".{name}.{id(self)}.part")
+
+        try:
+            if self.isCancelled():
+                raise JobCancelled()
+
+            if (encoded := self.encoded) is not None:
+                # Saving an unchanged file over itself has nothing to write.
+                if not encoded.isFile(self.path):
+                    inPlace = encoded.path is not None and os.path.exists(
+                        self.path
+                    ) and os.path.samefile(encoded.path, self.path)
+                    with open(partPath, "xb") as partFile:
+                        encoded.copyTo(partFile, self._copied)
+                    os.replace(partPath, self.path)
+                    if inPlace:
+                        self.image.encoded.rewritten(encoded.orientation)
+            else:
+                # A draft opened file is only decoded in full here, under
+                # the lock of the pyramid other documents may be reading.
+                self.image.load()
+                image = self.image.render()
+                imageFormat = self.imageFormat or self._formatFromPath()
+                image = encodableImage(image, imageFormat)
+
+                if self.isCancelled():
+                    raise JobCancelled()
+
+                with open(partPath, "xb") as partFile:
+                    image.save(
+                        CancellableWriter(partFile, self), imageFormat,
+                        **self.params
+                    )
+                os.replace(partPath, self.path)
+        except JobCancelled:
+            self._removePart(partPath)
+            self.signals.cancelled.emit()
+        except Exception as e:
+            self._removePart(partPath)
+            self.signals.failed.emit(e)
+        else:
+            self.signals.finished.emit(self.path)
+
+    def _copied(self, count: int) -> None:
+        if self.isCancelled():
+            raise JobCancelled()
+        self.bytesWritten += count
+        self.signals.progress.emit(self.bytesWritten)
+
+    def _formatFromPath(self) -> str:
+        extension = os.path.splitext(self.path)[1].lower()
+        try:
+            return Image.registered_extensions()[extension]
+        except KeyError:
+            raise ValueError(f"Unknown File Extension: \"{extension}\"")
+
+    @staticmethod
+    def _removePart(partPath: str) -> None:
+        try:
+            os.remove(partPath)
+        except OSError:
+            pass
+
+
+class LoadJob(QRunnable):
+    chunkSize = 1 << 20
+    previewInterval = 0.15
+    previewSize = 2048
+
+    def __init__(self, path: str) -> None:
+        super().__init__()
+        self.setAutoDelete(False)
+
+        self.path = path
+
+        self.signals = LoadSignals()
+
+        self._cancelled = False
+        self._lastPreview = 0
+        self._scratch = None
+
+    def cancel(self) -> None:
+        self._cancelled = True
+
+    def isCancelled(self) -> bool:
+        return self._cancelled
+
+    def readProgressed(self) -> None:
+        if self._scratch is not None:
+            self._preview(self._scratch)
+
+    def run(self) -> None:
+        try:
+            with openImage(self.path) as image:
+                outOfCore = exceeds(image.mode, image.size)
+            image = self._loadScratch() if outOfCore else self._load()
+
+            # Decoded from a buffer or a reader, so the document would not
+            # know which file its bytes came from otherwise.
+            image.filename = self.path
+        except JobCancelled:
+            self.signals.cancelled.emit()
+        except Exception as e:
+            self.signals.failed.emit(e)
+        else:
+            self.signals.finished.emit(image)
+
+    def _load(self) -> Image.Image:
+        total = max(1, os.path.getsize(self.path))
+        parser = ImageFile.Parser()
+        buffered = None
+        done = 0
+
+        # The file is read in chunks on this thread, so a slow drive never
+        # blocks the window and cancelling takes effect between chunks.
+        with open(self.path, "rb") as file:
+            while chunk := file.read(self.chunkSize):
+                if self.isCancelled():
+                    raise JobCancelled()
+
+                done += len(chunk)
+                self.signals.progress.emit(done * 100 // total)
+
+                if buffered is not None:
+                    buffered.append(chunk)
+                    continue
+
+                if parser.image is None:
+                    # The parser opens the image once the header is in.
+                    with largeImages():
+                        parser.feed(chunk)
+                else:
+                    parser.feed(chunk)
+                if parser.decoder is not None:
+                    self._preview(parser.image)
+                elif parser.image is not None and not parser.finished:
+                    # Formats with their own read code (PNG, JPEG) can not
+                    # be decoded as they arrive, so the rest of the file is
+                    # collected without the parser copying it every time.
+                    buffered = [parser.data]
+
+        if buffered is None:
+            return parser.close()
+
+        data = b"".join(buffered)
+        if parser.image.format == "JPEG":
+            # A 1/8 scaled decode costs a fraction of the full one and is
+            # on screen while the full resolution pixels are decoded.
+            preview = openImage(io.BytesIO(data))
+            preview.draft(
+                preview.mode,
+                (max(1, preview.size[0] >> 3), max(1, preview.size[1] >> 3),)
+            )
+            preview.load()
+            self.signals.preview.emit(preview)
+
+        if self.isCancelled():
+            raise JobCancelled()
+
+        image = openImage(io.BytesIO(data))
+        image.load()
+        return image
+
+    def _loadScratch(self) -> Image.Image:
+        # Too large for memory: the decoder writes straight into a scratch
+        # file, and previews sample that file between reads of the source.
+        with open(self.path, "rb") as file:
+            image = openImage(ProgressReader(file, self))
+            self._scratch = scratchImage(image.mode, image.size)
+            image.im = self._scratch.im
+            try:
+                image.load()
+            finally:
+                self._scratch = None
+        return image
+
+    def _preview(self, image: Image.Image) -> None:
+        now = time.monotonic()
+        if now - self._lastPreview < self.previewInterval:
+            return
+        self._lastPreview = now
+
+        # The rows decoded so far, sampled down to a size that is cheap to
+        # convert; the rest of the image is still blank. Nearest neighbour
+        # only reads the pixels it keeps, so previews barely slow the decode.
+        scale = min(1, self.previewSize / max(image.size))
+        self.signals.preview.emit(image.resize(
+            (
+                max(1, round(image.size[0] * scale)),
+                max(1, round(image.size[1] * scale)),
+            ),
+            Image.NEAREST
+        ))
+
+
+class TransformJob(QRunnable):
+    def __init__(self, image: Image.Image, function, *args, **kwargs) -> None:
+        super().__init__()
+        self.setAutoDelete(False)
+
+        # Nothing is decoded up front: a document's render decodes just the
+        # level of its pyramid it starts from, under the pyramid's lock.
+        self.image = image
+        self.function = function
+        self.args = args
+        self.kwargs = kwargs
+
+        self.signals = JobSignals()
+
+        self._cancelled = False
+
+    def cancel(self) -> None:
+        self._cancelled = True
+
+    def isCancelled(self) -> bool:
+        return self._cancelled
+
+    def _progress(self, done: int, total: int) -> None:
+        if self.isCancelled():
+            raise JobCancelled()
+        self.signals.progress.emit(int(done * 100 / total))
+
+    def run(self) -> None:
+        try:
+            if self.isCancelled():
+                raise JobCancelled()
+            result = self.function(
+                self.image, *self.args, progress=self._progress, **self.kwargs
+            )
+            if self.isCancelled():
+                raise JobCancelled()
+        except JobCancelled:
+            self.signals.cancelled.emit()
+        except Exception as e:
+            self.signals.failed.emit(e)
+        else:
+            self.signals.finished.emit(result)
+
+
+class TransformEngine(QObject):
+    busyChanged = pyqtSignal(bool)
+    progress = pyqtSignal(int)
+    finished = pyqtSignal(object, object)
+    failed = pyqtSignal(object, object)
+
+    def __init__(self, parent: QObject = None) -> None:
+        super().__init__(parent)
+
+        self._job = None
+        self._running = set()
+
+    def isBusy(self) -> bool:
+        return self._job is not None
+
+    def hasRunningJobs(self) -> bool:
+        # Cancelled jobs count until they stop, since they still report
+        # back to the engine.
+        return bool(self._running)
+
+    def submit(
+        self, tag, image: Image.Image, function, *args, **kwargs
+    ) -> TransformJob:
+        def __finished(result: Image.Image) -> None:
+            self._running.discard(job)
+            if job is self._job:
+                self._done()
+                self.finished.emit(result, tag)
+
+        def __failed(e: Exception) -> None:
+            self._running.discard(job)
+            if job is self._job:
+                self._done()
+                self.failed.emit(e, tag)
+
+        def __cancelled() -> None:
+            self._running.discard(job)
+
+        def __progress(percentage: int) -> None:
+            if job is self._job:
+                self.progress.emit(percentage)
+
+        # A newer request always replaces the one in flight; the old job
+        # stops at its next band and its result is dropped either way.
+        wasBusy = self.isBusy()
+        self.cancel(emit=False)
+
+        job = TransformJob(image, function, *args, **kwargs)
+        job.signals.finished.connect(__finished)
+        job.signals.failed.connect(__failed)
+        job.signals.progress.connect(__progress)
+        job.signals.cancelled.connect(__cancelled)
+
+        self._job = job
+        self._running.add(job)
+
+        if not wasBusy:
+            self.busyChanged.emit(True)
+        self.progress.emit(0)
+
+        QThreadPool.globalInstance().start(job)
+
+        return job
+
+    def cancel(self, emit: bool = True) -> None:
+        if self._job is not None:
+            self._job.cancel()
+            self._job = None
+            if emit:
+                self.busyChanged.emit(False)
+
+    def _done(self) -> None:
+        self._job = None
+        self.busyChanged.emit(False)
+
+
+class BatchJob(QRunnable):
+    # The coordinator blocks on its process pool for the whole run, so it
+    # gets threads of its own instead of holding one of the global pool,
+    # which loads, saves and renders share.
+    _pool = None
+
+    @classmethod
+    def pool(cls) -> QThreadPool:
+        if cls._pool is None:
+            cls._pool = QThreadPool()
+        return cls._pool
+
+    def __init__(
+        self, sources: list, outputDir: str, imageFormat: str, extension: str,
+        pipeline: list, fillcolor=None, workers: int = None
+    ) -> None:
+        super().__init__()
+        self.setAutoDelete(False)
+
+        self.sources = sources
+        self.outputDir = outputDir
+        self.imageFormat = imageFormat
+        self.extension = extension
+        self.pipeline = pipeline
+        self.fillcolor = fillcolor
+        self.workers = workers
+
+        self.signals = BatchSignals()
+
+        self._cancelled = False
+
+    def cancel(self) -> None:
+        self._cancelled = True
+
+    def isCancelled(self) -> bool:
+        return self._cancelled
+
+    def run(self) -> None:
+        from batch import runBatch
+
+        # The conversions themselves run in a process pool; this thread only
+        # hands out files and forwards every result as it arrives.
+        converted = failed = bytesRead = 0
+        start = time.perf_counter()
+
+        try:
+            for result in runBatch(
+                self.sources, self.outputDir, self.imageFormat,
+                self.extension, self.pipeline, self.fillcolor, self.workers,
+                self.isCancelled
+            ):
+                if result.error is None:
+                    converted += 1
+                    bytesRead += result.bytesRead
+                else:
+                    failed += 1
+                self.signals.result.emit(result)
+                self.signals.progress.emit(converted + failed)
+        except Exception as e:
+            self.signals.failed.emit(e)
+            return
+
+        if self.isCancelled():
+            self.signals.cancelled.emit()
+        else:
+            self.signals.finished.emit((
+                converted, failed, bytesRead, time.perf_counter() - start,
+            ))
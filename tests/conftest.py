@@ -0,0 +1,6 @@
+import os
+import sys
+
+# The modules sit side by side in src and import each other by name, the
+# same way main.py runs them.
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "src"))
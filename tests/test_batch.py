@@ -0,0 +1,61 @@
+import os
+
+import pytest
+
+from batch import parseSize, targetPath, targetSize
+
+
+@pytest.mark.parametrize("value, size", [
+    ("800x600", (800, 600,)),
+    ("800X600", (800, 600,)),
+    ("800x", (800, None,)),
+    ("x600", (None, 600,)),
+    ("800", (800, None,)),
+    ("50%", (50.0,)),
+    ("12.5%", (12.5,))
+])
+def testParseSize(value, size):
+    assert parseSize(value) == size
+
+
+@pytest.mark.parametrize("value", [
+    "", "x", "0x600", "800x-1", "0%", "-5%", "abc", "axb", "%"
+])
+def testParseSizeRejects(value):
+    with pytest.raises(ValueError, match="Invalid Size"):
+        parseSize(value)
+
+
+@pytest.mark.parametrize("requested, size", [
+    ((50.0,), (100, 50,)),
+    ((300, 120,), (300, 120,)),
+    ((None, 50,), (100, 50,)),
+    ((50, None,), (50, 25,)),
+    ((0.1,), (1, 1,)),
+    ((1, None,), (1, 1,))
+])
+def testTargetSize(requested, size):
+    assert targetSize((200, 100,), requested) == size
+
+
+def testTargetPathWithoutTakenNames():
+    assert targetPath(os.path.join("in", "a.jpg"), "out", ".png") == \
+        os.path.join("out", "a.png")
+
+
+def testTargetPathNumbersClashes():
+    taken = set()
+
+    paths = [
+        targetPath(source, "out", ".png", taken)
+        for source in [
+            os.path.join("in", "a.jpg"), os.path.join("in", "a.png"),
+            os.path.join("other", "a.jpg"), os.path.join("in", "b.jpg"),
+            os.path.join("in", "a-2.gif")
+        ]
+    ]
+
+    assert paths == [
+        os.path.join("out", name)
+        for name in ["a.png", "a-2.png", "a-3.png", "b.png", "a-2-2.png"]
+    ]
@@ -0,0 +1,88 @@
+from PIL import Image
+
+import io
+
+import pytest
+
+from encodedsource import exifHeader, orientationTag, orientedExif, orientedHead
+
+
+def jpegBytes(exif: bytes = None) -> bytes:
+    image = Image.new("RGB", (16, 8), "white")
+    image.putpixel((0, 0), (255, 0, 0))
+
+    data = io.BytesIO()
+    if exif is None:
+        image.save(data, "JPEG")
+    else:
+        image.save(data, "JPEG", exif=exif)
+    return data.getvalue()
+
+
+def exifWith(orientation: int) -> bytes:
+    exif = Image.Exif()
+    exif[orientationTag] = orientation
+    exif[0x010F] = "Camera Maker"
+    return exif.tobytes()
+
+
+def reoriented(data: bytes, orientation: int) -> bytes:
+    source = io.BytesIO(data)
+    head = orientedHead(source, orientation)
+    return head + source.read()
+
+
+def testOrientedExifPatchesTheEntryInPlace():
+    payload = exifWith(1)
+
+    patched = orientedExif(payload, 6)
+
+    assert len(patched) == len(payload)
+    assert sum(a != b for a, b in zip(patched, payload)) == 1
+    exif = Image.Exif()
+    exif.load(patched)
+    assert exif[orientationTag] == 6
+    assert exif[0x010F] == "Camera Maker"
+
+
+def testOrientedExifCreatesASegment():
+    payload = orientedExif(b"", 3)
+
+    assert payload.startswith(exifHeader)
+    exif = Image.Exif()
+    exif.load(payload)
+    assert exif[orientationTag] == 3
+
+
+def testOrientedHeadKeepsTheRestOfTheFile():
+    data = jpegBytes(exifWith(1))
+
+    result = reoriented(data, 8)
+
+    assert len(result) == len(data)
+    with Image.open(io.BytesIO(result)) as image:
+        assert image.getexif()[orientationTag] == 8
+        with Image.open(io.BytesIO(data)) as original:
+            assert image.tobytes() == original.tobytes()
+
+
+def testOrientedHeadAddsExifAfterTheJfifHeader():
+    data = jpegBytes()
+    assert data[2:4] == b"\xff\xe0"
+
+    result = reoriented(data, 3)
+
+    assert result[2:4] == b"\xff\xe0"
+    with Image.open(io.BytesIO(result)) as image:
+        assert image.getexif()[orientationTag] == 3
+        with Image.open(io.BytesIO(data)) as original:
+            assert image.tobytes() == original.tobytes()
+
+
+def testOrientedHeadRejectsOtherFormats():
+    data = io.BytesIO()
+    Image.new("RGB", (4, 4)).save(data, "PNG")
+    data.seek(0)
+
+    with pytest.raises(ValueError):
+        orientedHead(data, 6)
@@ -0,0 +1,104 @@
+from PIL import Image
+
+import pytest
+
+from operations import (
+    Resize,
+    Rotate,
+    Transpose,
+    _chains,
+    applyOperations,
+    fuse,
+    orientationAfter,
+    orientationMethods
+)
+from transforms import rotateImage
+
+
+def asymmetricImage() -> Image.Image:
+    # Every flip and quarter turn of this image looks different.
+    image = Image.new("RGB", (6, 4), "white")
+    image.putpixel((0, 0), (255, 0, 0))
+    image.putpixel((5, 0), (0, 255, 0))
+    image.putpixel((0, 3), (0, 0, 255))
+    return image
+
+
+def testRotationsWithDifferentFillsAreNotFused():
+    chains = _chains((Rotate(30), Rotate(30, "red")))
+
+    assert [len(chain) for chain, _ in chains] == [1, 1]
+    assert [fillcolor for _, fillcolor in chains] == [None, "red"]
+
+
+def testRotationsWithTheSameFillShareAChain():
+    operations = (
+        Rotate(10, "red"), Transpose(Image.FLIP_LEFT_RIGHT),
+        Resize((50, 40)), Rotate(20, "red")
+    )
+
+    assert _chains(operations) == [(list(operations), "red",)]
+
+
+def testCornersOfTheFirstRotationKeepTheDefaultFill():
+    image = Image.new("RGB", (200, 100), "white")
+
+    fused = applyOperations(image, (Rotate(30), Rotate(30, "red")))
+    expected = rotateImage(
+        rotateImage(image, 30, None, Image.BICUBIC), 30, "red",
+        Image.BICUBIC
+    )
+
+    assert fused.size == expected.size
+
+    # Everything the first rotation uncovered is black in the sequential
+    # result, and stays black when both rotations are fused.
+    expectedPixels = expected.load()
+    fusedPixels = fused.load()
+    uncovered = [
+        (x, y,)
+        for x in range(expected.size[0]) for y in range(expected.size[1])
+        if expectedPixels[x, y] == (0, 0, 0)
+    ]
+    assert uncovered
+    assert all(fusedPixels[xy] != (255, 0, 0) for xy in uncovered)
+
+
+def testQuarterTurnsFuseIntoATranspose():
+    image = asymmetricImage()
+    operations = (
+        Transpose(Image.ROTATE_90), Transpose(Image.FLIP_LEFT_RIGHT)
+    )
+
+    steps = fuse(image.size, operations)
+
+    assert len(steps) == 1
+    assert isinstance(steps[0], Transpose)
+    assert applyOperations(image, operations).tobytes() == image.transpose(
+        Image.ROTATE_90
+    ).transpose(Image.FLIP_LEFT_RIGHT).tobytes()
+
+
+@pytest.mark.parametrize("orientation", range(1, 9))
+@pytest.mark.parametrize("method", [
+    Image.FLIP_LEFT_RIGHT, Image.FLIP_TOP_BOTTOM, Image.ROTATE_90,
+    Image.ROTATE_180, Image.ROTATE_270, Image.TRANSPOSE, Image.TRANSVERSE
+])
+def testOrientationAfterShowsTheEditedImage(orientation, method):
+    stored = asymmetricImage()
+    shown = stored.transpose(orientationMethods[orientation]) \
+        if orientation in orientationMethods else stored
+
+    result = orientationAfter(orientation, (Transpose(method),))
+
+    assert result in range(1, 9)
+    reoriented = stored.transpose(orientationMethods[result]) \
+        if result in orientationMethods else stored
+    assert reoriented.tobytes() == shown.transpose(method).tobytes()
+
+
+def testOrientationAfterUndoingEveryTurn():
+    operations = (Transpose(Image.ROTATE_90),) * 4
+
+    assert orientationAfter(6, operations) == 6
+    assert orientationAfter(1, ()) == 1